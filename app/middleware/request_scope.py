@@ -0,0 +1,16 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.services.data_loader import request_scope
+
+class RequestScopeMiddleware:
+    """Runs every HTTP request in its own document loader scope."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_scope():
+            await self.app(scope, receive, send)
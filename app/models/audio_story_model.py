@@ -37,9 +37,10 @@ class AudioStoryList(AudioStoryBase):
 
 # Model for paginated response of audio stories
 class PaginatedAudioResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None  # None in cursor mode with estimated totals
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     channel_info: Optional[Dict[str, Any]] = None
     data: List[AudioStoryList]
\ No newline at end of file
@@ -1,6 +1,6 @@
 # channel_model.py
-from pydantic import BaseModel, constr
-from typing import Optional, List
+from pydantic import BaseModel, Field, constr
+from typing import Optional, List, Union
 from datetime import datetime
 
 # Base model for shared fields
@@ -9,7 +9,7 @@ class ChannelBase(BaseModel):
     title: str
     description: Optional[constr(min_length=10, max_length=500)]
     thumbnail_url: Optional[constr(pattern=r"^https?://[^\s]+$", min_length=5, max_length=500)]
-    order_position: int
+    order_position: Union[int, float]  # Fractional after moves in fractional order mode
 
 # Model for creating a channel
 class ChannelCreate(ChannelBase):
@@ -49,10 +49,15 @@ class ChannelSetOrder(BaseModel):
     channel_id: str
     order_position: int
 
+# Model for applying a full channel ordering
+class ChannelReorder(BaseModel):
+    channel_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
 # Model for paginated response of channels
 class PaginatedChannelsResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None  # None in cursor mode with estimated totals
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     data: List[ChannelActiveList]
\ No newline at end of file
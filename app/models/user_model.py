@@ -14,10 +14,11 @@ class UserList(UserBase):
 
 # Model for paginated response of users
 class PaginatedUserResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None  # None in cursor mode with estimated totals
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     channel: Optional[Dict[str, Any]] = None
     data: List[UserList]
 
@@ -43,6 +44,7 @@ class PlaylistCreate(BaseModel):
 # Model for updating an existing playlist contents
 class PlaylistContentUpdate(BaseModel):
     video_id: str
+    playlist_id: Optional[str] = None  # The user's oldest playlist when omitted
 
 # Playlist create response model
 class PlaylistCreateResponse(UserResponse):
@@ -84,4 +86,17 @@ class SignOutResponse(BaseModel):
 class PlaylistContentsResponse(BaseModel):
     playlist_id: str
     name: str
-    playlist_items: List[Dict[str, Any]]
\ No newline at end of file
+    total: Optional[int] = None
+    page: Optional[int] = None
+    page_size: Optional[int] = None
+    next_cursor: Optional[str] = None
+    playlist_items: List[Dict[str, Any]]
+
+# Model for one of the user's playlists
+class PlaylistSummary(BaseModel):
+    playlist_id: str
+    name: str
+
+# Model for the user's playlists
+class PlaylistListResponse(BaseModel):
+    playlists: List[PlaylistSummary]
\ No newline at end of file
@@ -1,14 +1,15 @@
 # admins.py
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request
 from typing import List
 import uuid
 from auth.dependencies import JWTAuthGuard
-from app.models import AdminList, PaginatedUserResponse, ChannelList, ChannelCreate, ChannelUpdate, ChannelResponse, ChannelSetOrder, PaginatedChannelsResponse, ChannelView, AudioStoryCreate, AudioStoryQueuedResponse
+from app.models import AdminList, PaginatedUserResponse, ChannelList, ChannelCreate, ChannelUpdate, ChannelResponse, ChannelSetOrder, ChannelReorder, PaginatedChannelsResponse, ChannelView, AudioStoryCreate, AudioStoryQueuedResponse
 from app.services import AdminService, UserService, ChannelService, AudioStoriesService
+from app.services.channel_catalog import channel_catalog
 from app.jobs import download_audio_and_get_info
-from common import RedisHashCache
+from common import RedisHashCache, cache_metrics, hasher_stats, token_versions
 from config import config
-from utils.helpers import process_cache_key
+from utils.helpers import process_cache_key, build_cached_response
 from fastapi.encoders import jsonable_encoder
 
 adminRouter = APIRouter(
@@ -57,6 +58,21 @@ async def admin_profile(current_user: dict = Depends(JWTAuthGuard("admin"))):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Apply a full channel ordering in one write
+@adminRouter.post("/channel-reorder", response_model=ChannelResponse)
+async def reorder_channels(data: ChannelReorder, current_user: dict = Depends(JWTAuthGuard("admin"))):
+    try:
+        result = await channel_service.reorder_channels(data.channel_ids)
+
+        # Delete cache for active channels
+        cache_key = process_cache_key()
+        await cache.invalidate(cache_key, "list_active_channels")
+        return {"status": True, "detail": f"Channels reordered successfully ({result['updated']} updated)."}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Create a new channel
 @adminRouter.post("/channel-create", response_model=ChannelList)
 async def create_channel(
@@ -83,7 +99,7 @@ async def create_channel(
 
         # Delete cache for active channels
         cache_key = process_cache_key()
-        await cache.h_del_wildcard(cache_key, "list_active_channels")
+        await cache.invalidate(cache_key, "list_active_channels")
         return created_channel
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -109,7 +125,7 @@ async def update_channel_status(
 
         # Delete cache for active channels
         cache_key = process_cache_key()
-        await cache.h_del_wildcard(cache_key, "list_active_channels")
+        await cache.invalidate(cache_key, "list_active_channels")
 
         return {
             "status": True,
@@ -134,33 +150,48 @@ async def set_channel_order(data: ChannelSetOrder, current_user: dict = Depends(
 
         # Delete cache for active channels
         cache_key = process_cache_key()
-        await cache.h_del_wildcard(cache_key, "list_active_channels")
+        await cache.invalidate(cache_key, "list_active_channels")
         return {"status": True, "detail": "Channel order updated successfully."}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # List all active channels
 @adminRouter.get("/channel-list", response_model=PaginatedChannelsResponse)
 async def list_active_channels(
+        request: Request,
         page: int = Query(1, ge=1, le=1000, description="Page number for pagination"),
         page_size: int = Query(10, ge=1, le=100, description="Number of channels per page"),
+        cursor: str = Query(None, max_length=512, description="Cursor from a previous page's next_cursor; overrides page"),
         current_user: dict = Depends(JWTAuthGuard("admin"))
 ):
     try:
+        # This worker's channel catalog serves the list without Redis or Mongo once loaded, each page rendered once per snapshot
+        if channel_catalog.ready:
+            body = channel_service.render_catalog_page(
+                lambda channels: cache.render_body(channels, PaginatedChannelsResponse), page=page, page_size=page_size, cursor=cursor
+            )
+            return build_cached_response(request, body)
+
         cache_key = process_cache_key()
 
-        # Check cache
-        cached_channels = await cache.h_get(cache_key, "list_active_channels")
-        if cached_channels is not None:
-            return cached_channels
+        # Page-number and cursor mode pages are cached separately
+        params = {"cursor": cursor, "page_size": page_size} if cursor else {"page": page, "page_size": page_size}
 
-        channels = await channel_service.list_active_channels(page=page, page_size=page_size)
+        # Load active channels on cache miss
+        async def load_channels():
+            channels = await channel_service.list_active_channels(page=page, page_size=page_size, cursor=cursor)
 
-        if not channels:
-            raise HTTPException(status_code=404, detail="No active channels found.")
+            if not channels:
+                raise HTTPException(status_code=404, detail="No active channels found.")
+            return jsonable_encoder(channels)
 
-        await cache.h_set(cache_key, "list_active_channels", jsonable_encoder(channels), {"page": page, "page_size": page_size})
-        return channels
+        # Concurrent misses across workers share a single Mongo query
+        channels = await cache.get_or_set_response(cache_key, "list_active_channels", load_channels, PaginatedChannelsResponse, params, distributed=True)
+        return build_cached_response(request, channels)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -200,7 +231,7 @@ async def update_channel(data: ChannelUpdate, current_user: dict = Depends(JWTAu
 
         # Delete cache for active channels
         cache_key = process_cache_key()
-        await cache.h_del_wildcard(cache_key, "list_active_channels")
+        await cache.invalidate(cache_key, "list_active_channels")
         return {"status": True, "detail": "Channel updated successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -237,7 +268,7 @@ async def create_audio_story(
 
     # Delete cache for the specific channel's stories
     cache_key = process_cache_key()
-    await cache.h_del_wildcard(cache_key, f"channel_story|channel_id={data.channel_id}")
+    await cache.invalidate(cache_key, "channel_story", data.channel_id)
     return audio_story
 
 # Remove an audio story
@@ -250,7 +281,7 @@ async def delete_audio_story(channel_id: str, story_id: str, current_user: dict
 
         # Delete cache for the specific channel's stories
         cache_key = process_cache_key()
-        await cache.h_del_wildcard(cache_key, f"channel_story|channel_id={channel_id}")
+        await cache.invalidate(cache_key, "channel_story", channel_id)
         return {"detail": "Audio story deleted successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -270,16 +301,16 @@ async def update_user_status(
         # Toggle the status
         new_status = not user.get("is_active", False)
 
-        updated = await user_service.update_user(
-            user_id=user_id,
-            update_data={"is_active": new_status}
-        )
+        updated = await user_service.set_user_status(user_id=user_id, is_active=new_status)
         if not updated:
             raise HTTPException(status_code=500, detail="Failed to update user status.")
 
+        # Deactivated users lose their sessions immediately; if Redis misses the bump it is retried in the background
+        await token_versions.bump("user", user_id)
+
         # Delete cache for user list
         cache_key = process_cache_key()
-        await cache.h_del(cache_key, "list_users")
+        await cache.invalidate(cache_key, "list_users")
         return {"detail": f"User {'activated' if new_status else 'deactivated'} successfully."}
 
     except Exception as e:
@@ -290,22 +321,47 @@ async def update_user_status(
 async def list_users(
         page:int =  Query(1, ge=1, le=1000, description="Page number for pagination"),
         page_size:int = Query(10, ge=1, le=100, description="Number of users per page"),
+        cursor:str = Query(None, max_length=512, description="Cursor from a previous page's next_cursor; overrides page"),
         current_user: dict = Depends(JWTAuthGuard("admin"))
 ):
     try:
         cache_key = process_cache_key()
 
+        # Page-number and cursor mode pages are cached separately
+        params = {"cursor": cursor, "page_size": page_size} if cursor else {"page": page, "page_size": page_size}
+
         # Check cache
-        cached_users = await cache.h_get(cache_key, "list_users")
+        cached_users = await cache.h_get(cache_key, "list_users", params)
         if cached_users is not None:
             return cached_users
 
-        users = await user_service.list_users()
+        users = await user_service.list_users(page=page, page_size=page_size, cursor=cursor)
         if not users:
             raise HTTPException(status_code=404, detail="No users found.")
 
         # Cache the list of users
-        await cache.h_set(cache_key, "list_users", jsonable_encoder(users), {"page": page, "page_size": page_size})
+        await cache.h_set(cache_key, "list_users", jsonable_encoder(users), params)
         return users
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Cache metrics snapshot for this worker process
+@adminRouter.get("/cache-metrics")
+async def get_cache_metrics(current_user: dict = Depends(JWTAuthGuard("admin"))):
+    try:
+        metrics = cache_metrics.snapshot()
+        metrics["local_entries"] = len(cache.local.entries) if cache.local is not None else None
+        metrics["redis_breaker"] = cache.breaker.snapshot()
+        return metrics
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Password hashing pool metrics for this worker process
+@adminRouter.get("/hasher-metrics")
+async def get_hasher_metrics(current_user: dict = Depends(JWTAuthGuard("admin"))):
+    try:
+        return hasher_stats.snapshot()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
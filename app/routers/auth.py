@@ -1,10 +1,10 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from app.models import LoginRequest, SignupRequest, TokenRefreshRequest, AccessTokenResponse, RefreshTokenResponse, ForgotPasswordRequest, PasswordResetRequest, PasswordResetResponse, VerifyEmailResponse
 from common.access_tokens import AccessTokenManager
 from common.password_utils import PasswordHasher
 from app.services import AdminService, UserService, PasswordResetService
 from config import config
-from common import RedisHashCache
+from common import RedisHashCache, rate_limiter
 from utils.helpers import process_cache_key
 from app.notifications import EmailVerificationNotification, PasswordResetNotification
 import uuid
@@ -27,16 +27,26 @@ password_notification = PasswordResetNotification()
 
 # Admin login endpoint
 @authRouter.post("/admin", response_model=AccessTokenResponse)
-async def login(data: LoginRequest):
+async def login(request: Request, data: LoginRequest, background_tasks: BackgroundTasks):
     try:
+        # Throttle attempts per IP and per email before spending a bcrypt verify
+        await rate_limiter.enforce("admin_login", request, email=data.email)
+
         if data.type.strip().lower() != "admin":
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         admin = await admin_service.find_admin_with_email(data.email)
+        if not admin:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
 
-        if not admin or not password_hash.verify(data.password, admin["password_hash"]):
+        valid, new_hash = await password_hash.verify_and_update(data.password, admin["password_hash"])
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
+        # Store the hash again with the current work factor
+        if new_hash:
+            background_tasks.add_task(admin_service.update_password_hash, admin["objectId"], admin["password_hash"], new_hash)
+
         remember_token = False
         if data.remember_me and bool(data.remember_me) is True:
             remember_token = True
@@ -66,7 +76,7 @@ async def user_signup(data: SignupRequest, background_tasks: BackgroundTasks):
         if existing_user:
             raise HTTPException(status_code=409, detail="User with this email already exists")
 
-        hashed_password = password_hash.hash(data.password)
+        hashed_password = await password_hash.hash(data.password)
         verification_token = str(uuid.uuid4())
 
         # Create a new user object
@@ -79,7 +89,6 @@ async def user_signup(data: SignupRequest, background_tasks: BackgroundTasks):
             "role": "user",
             "is_active": True,
             "favorite_channels": [],
-            "playlists": [],
             "is_verified": False,
             "verification_token": verification_token,
             "created_at": None,
@@ -101,9 +110,9 @@ async def user_signup(data: SignupRequest, background_tasks: BackgroundTasks):
         if not token_response:
             raise HTTPException(status_code=500, detail="Could not generate tokens")
         else:
-            # Delete cache for active channels
+            # Delete cache for user list
             cache_key = process_cache_key()
-            await cache.h_del_wildcard(cache_key, "list_users")
+            await cache.invalidate(cache_key, "list_users")
 
         return token_response
     except HTTPException:
@@ -131,17 +140,28 @@ async def verify_email(token: str):
 
 # User login  endpoint
 @authRouter.post("/user", response_model=AccessTokenResponse)
-async def user_login(data: LoginRequest):
+async def user_login(request: Request, data: LoginRequest, background_tasks: BackgroundTasks):
     try:
+        # Throttle attempts per IP and per email before spending a bcrypt verify
+        await rate_limiter.enforce("user_login", request, email=data.email)
+
         if data.type.strip().lower() != "user":
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         user = await user_service.find_user_with_email(data.email)
 
         # Check if user exists and password matches
-        if not user or not password_hash.verify(data.password, user["password_hash"]):
+        if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
+        valid, new_hash = await password_hash.verify_and_update(data.password, user["password_hash"])
+        if not valid:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        # Store the hash again with the current work factor
+        if new_hash:
+            background_tasks.add_task(user_service.update_password_hash, user["objectId"], user["password_hash"], new_hash)
+
         # Check if user email is verified
         if not user["is_verified"]:
             raise HTTPException(status_code=403, detail="Email not verified")
@@ -172,8 +192,11 @@ async def refresh_token(data: TokenRefreshRequest):
 
 # Forgot password endpoint (Admin and User both)
 @authRouter.post("/forgot-password", response_model=PasswordResetResponse)
-async def forgot_password(data: ForgotPasswordRequest, background_tasks: BackgroundTasks):
+async def forgot_password(request: Request, data: ForgotPasswordRequest, background_tasks: BackgroundTasks):
     try:
+        # Throttle reset emails per IP and per email address
+        await rate_limiter.enforce("forgot_password", request, email=data.email)
+
         if data.type.lower() == 'admin':
             resource = await admin_service.find_admin_with_email(data.email)
         elif data.type.lower() == 'user':
@@ -209,7 +232,7 @@ async def reset_password(data: PasswordResetRequest):
         if (data.new_password != data.confirm_password) or (len(data.new_password) < 6):
             raise HTTPException(status_code=400, detail="Passwords do not match or are too short")
 
-        hashed_password = password_hash.hash(data.new_password)
+        hashed_password = await password_hash.hash(data.new_password)
         reset_data = await password_reset_service.reset_password(reset_token=data.reset_token, new_password_hash=hashed_password)
 
         if reset_data is None:
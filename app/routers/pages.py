@@ -1,10 +1,10 @@
 # pages.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.models import PageResponse
 from app.services import PageService
 from common import RedisHashCache
 from config import config
-from utils.helpers import process_cache_key
+from utils.helpers import process_cache_key, build_cached_response
 
 pageRouter = APIRouter(prefix="/page", tags=["page"])
 page_service = PageService()
@@ -12,28 +12,24 @@ cache = RedisHashCache(prefix=config["cache_prefix"])
 
 # Get page content with slug
 @pageRouter.get("/{slug}", response_model=PageResponse)
-async def get_page_content(slug: str):
+async def get_page_content(request: Request, slug: str):
     try:
         cache_key = process_cache_key()
 
-        # Check cache
-        cached_page = await cache.h_get(cache_key, "resource_pages", {"slug": slug})
-        if cached_page is not None:
-            return cached_page
+        # Fetch active page with slug on cache miss
+        async def load_page():
+            page = await page_service.get_page_by_slug(slug)
+            if not page:
+                raise HTTPException(status_code=404, detail="Page not found")
 
-        # Fetch active page with slug
-        page = await page_service.get_page_by_slug(slug)
-        if not page:
-            raise HTTPException(status_code=404, detail="Page not found")
+            return {
+                "success": True,
+                "page": page.get("content", "")
+            }
 
-        page_content = {
-            "success": True,
-            "page": page.get("content", "")
-        }
-
-        # Set page content in cache
-        await cache.h_set(cache_key, "resource_pages", page_content, {"slug": slug})
-        return page_content
+        # Serve page content from cache, refreshing stale entries in the background
+        page_content = await cache.get_or_set_response(cache_key, "resource_pages", load_page, PageResponse, {"slug": slug})
+        return build_cached_response(request, page_content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
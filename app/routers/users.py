@@ -1,13 +1,13 @@
 # users.py
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import FileResponse
 from auth.dependencies import JWTAuthGuard
-from app.models import PlaylistCreate, PlaylistContentUpdate, PlaylistCreateResponse, PaginatedAudioResponse, PaginatedChannelsResponse, FavoriteChannel, UserResponse, UserProfileResponse, UserProfileUpdate, SignOutResponse, PlaylistContentsResponse
+from app.models import PlaylistCreate, PlaylistContentUpdate, PlaylistCreateResponse, PaginatedAudioResponse, PaginatedChannelsResponse, FavoriteChannel, UserResponse, UserProfileResponse, UserProfileUpdate, SignOutResponse, PlaylistContentsResponse, PlaylistListResponse
 from app.services import AdminService, UserService, ChannelService, AudioStoriesService, PlaylistService
+from app.services.channel_catalog import channel_catalog
 from common import RedisHashCache
 from config import config
-from utils.helpers import generate_signed_url, decode_signed_url_token, process_cache_key, generate_unique_id, generate_placeholder_img
-from jose import JWTError
+from utils.helpers import generate_signed_url, verify_signed_url_token, process_cache_key, generate_unique_id, generate_placeholder_img, build_cached_response
 from bson import ObjectId, errors as bson_errors
 import os
 
@@ -21,16 +21,20 @@ cache = RedisHashCache(prefix=config["cache_prefix"])
 
 # User sign-out functionality
 @userRouter.post("/sign-out", response_model=SignOutResponse)
-async def user_logout(current_user: dict = Depends(JWTAuthGuard("user"))):
+async def user_logout(
+        everywhere: bool = Query(False, description="Sign out of every session of the user"),
+        current_user: dict = Depends(JWTAuthGuard("user"))
+):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        # Revoke this session's tokens, or every session when asked to
+        await user_service.logout_user(current_user.get("id"), current_user, everywhere=everywhere)
 
         return {
             "status": True,
             "detail": "User sign out success"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -72,10 +76,6 @@ async def update_user_profile(
         current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         update_data = {
             "firstname": data.firstname,
             "lastname": data.lastname,
@@ -100,79 +100,70 @@ async def update_user_profile(
 # Get list of active channels
 @userRouter.get("/channels-list", response_model=PaginatedChannelsResponse)
 async def get_channels(
+        request: Request,
         page: int = Query(1, ge=1, le=1000, description="Page number for pagination"),
         page_size: int = Query(10, ge=1, le=100, description="Number of channels per page"),
+        cursor: str = Query(None, max_length=512, description="Cursor from a previous page's next_cursor; overrides page"),
         current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try:
-        cache_key = process_cache_key()
+        # This worker's channel catalog serves the list without Redis or Mongo once loaded, each page rendered once per snapshot
+        if channel_catalog.ready:
+            body = channel_service.render_catalog_page(
+                lambda channels: cache.render_body(channels, PaginatedChannelsResponse), page=page, page_size=page_size, cursor=cursor
+            )
+            return build_cached_response(request, body)
 
-        # Check cache
-        cached_channels = await cache.h_get(cache_key, "list_active_channels")
-        if cached_channels is not None:
-            return cached_channels
+        cache_key = process_cache_key()
 
-        # Fetch user details to ensure user exists
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        # Page-number and cursor mode pages are cached separately
+        params = {"cursor": cursor, "page_size": page_size} if cursor else {"page": page, "page_size": page_size}
 
         # Check channel service for active channels
-        channels = await channel_service.list_active_channels(page=page, page_size=page_size)
+        async def load_channels():
+            channels = await channel_service.list_active_channels(page=page, page_size=page_size, cursor=cursor)
 
-        if not channels:
-            raise HTTPException(status_code=404, detail="No active channels found.")
+            if not channels:
+                raise HTTPException(status_code=404, detail="No active channels found.")
+            return channels
 
-        # Paginated response
-        await cache.h_set(cache_key, "list_active_channels", channels, {"page": page, "page_size": page_size})
-        return channels
+        # Served from cache with stale entries refreshed in the background, concurrent misses share a single Mongo query
+        channels = await cache.get_or_set_response(cache_key, "list_active_channels", load_channels, PaginatedChannelsResponse, params, distributed=True)
+        return build_cached_response(request, channels)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Get list of stories by channel ID
 @userRouter.get("/channels/{channel_id}/stories", response_model=PaginatedAudioResponse)
 async def list_stories(
+        request: Request,
         channel_id: str,
         page: int = Query(1, ge=1, le=1000, description="Page number for pagination"),
         page_size: int = Query(10, ge=1, le=100, description="Number of stories per page"),
+        cursor: str = Query(None, max_length=512, description="Cursor from a previous page's next_cursor; overrides page"),
         current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try :
         cache_key = process_cache_key()
 
-        # Check cache
-        cached_stories = await cache.h_get(cache_key, "channel_story", {"channel_id": channel_id, "page": page, "page_size": page_size})
-        if cached_stories is not None:
-            return cached_stories
+        # Page-number and cursor mode pages are cached separately
+        params = {"channel_id": str(channel_id), "cursor": cursor, "page_size": page_size} if cursor else {"channel_id": str(channel_id), "page": page, "page_size": page_size}
 
-        # Fetch user details to ensure user exists
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        channel = await channel_service.find_channel_by_id(channel_id)
-        if not channel:
-            raise HTTPException(status_code=404, detail="Channel not found")
-        if not channel.get("is_active", True):
-            raise HTTPException(status_code=404, detail="Channel is not active")
-
-        channel_info = {
-            "youtube_channel_id": channel.get("youtube_channel_id", ""),
-            "title": channel.get("title", "No title available"),
-            "description": channel.get("description", "No description available"),
-            "thumbnail_url": channel.get("thumbnail_url", "https://example.com/default_thumbnail.png")
-        }
-
-        stories = await audio_stories_service.get_audio_story_by_channel_id(channel_id=channel_id, page=page, page_size=page_size)
-
-        if not stories:
-            raise HTTPException(status_code=404, detail="No stories found for this channel")
+        # Load channel info and stories on cache miss, in a single aggregation
+        async def load_stories():
+            stories = await audio_stories_service.get_channel_stories_page(channel_id=channel_id, page=page, page_size=page_size, cursor=cursor)
 
-        stories["channel_info"] = channel_info
+            if not stories:
+                raise HTTPException(status_code=404, detail="No stories found for this channel")
+            return stories
 
-        # Paginated response
-        await cache.h_set(cache_key, "channel_story", stories, {"channel_id": str(channel_id), "page": page, "page_size": page_size})
-        return stories
+        # Served from cache with stale entries refreshed in the background, concurrent misses share a single Mongo query
+        stories = await cache.get_or_set_response(cache_key, "channel_story", load_stories, PaginatedAudioResponse, params, distributed=True)
+        return build_cached_response(request, stories)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -184,17 +175,12 @@ async def fetch_audio(story_id: str, current_user: dict = Depends(JWTAuthGuard("
     if not story_id.isalnum():
         raise HTTPException(status_code=400, detail="Invalid Story ID format")
 
-    # Ensure user exists
-    user = await user_service.get_user_details_by_id(current_user.get("id"))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Fetch the audio story by ID
     story = await audio_stories_service.get_audio_story_by_id(story_id)
     if not story:
         raise HTTPException(status_code=404, detail="Audio story not found")
 
-    signed_url = generate_signed_url(story["file_name"], expiry_seconds=86400)
+    signed_url = generate_signed_url(story["file_name"], expiry_seconds=86400, user_id=current_user.get("id"))
 
     return {"signed_url": signed_url, "expires_in": 86400}
 
@@ -204,16 +190,11 @@ async def audio_download(filename: str, token: str = Query(...)):
     if not token:
         raise HTTPException(status_code=400, detail="Token is required")
 
-    try:
-        payload = decode_signed_url_token(token)
-
-        if payload.get("filename") != filename:
-            raise HTTPException(status_code=403, detail="Invalid token")
+    # Signature covers the filename, so a token cannot be reused for another file
+    verify_signed_url_token(filename, token)
 
-        if not filename.endswith('.m4a'):
-            raise HTTPException(status_code=400, detail="Invalid file type. Only .m4a files are allowed.")
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Invalid token")
+    if not filename.endswith('.m4a'):
+        raise HTTPException(status_code=400, detail="Invalid file type. Only .m4a files are allowed.")
 
     file_path = os.path.join('downloads', filename)
 
@@ -229,16 +210,12 @@ async def update_favorite_channel(
         current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Check and validate the given channel id
-        channel = await channel_service.find_channel_by_id(data.channel_id)
+        # Check and validate the given channel id, from the channel catalog when possible
+        channel = await channel_service.find_active_channel(data.channel_id)
         if not channel or not channel.get("is_active", True):
             raise HTTPException(status_code=404, detail="Channel not found")
 
-        set_favorite = True if ObjectId(data.channel_id) not in user.get("favorite_channels") else False
+        set_favorite = not await user_service.has_favourite_channel(current_user.get("id"), data.channel_id)
 
         # Update the favorite channel logic here
         updated_channel = await user_service.update_favourite_status(current_user.get("id"), data.channel_id, set_favorite)
@@ -250,14 +227,21 @@ async def update_favorite_channel(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# List the user's playlists
+@userRouter.get("/manage/playlists", response_model=PlaylistListResponse)
+async def list_playlists(current_user: dict = Depends(JWTAuthGuard("user"))):
+    try:
+        playlists = await playlist_service.list_user_playlists(current_user.get("id"))
+        return {"playlists": playlists}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Create a new playlist
 @userRouter.post("/manage/playlists", response_model=PlaylistCreateResponse)
 async def create_playlist(data: PlaylistCreate, current_user: dict = Depends(JWTAuthGuard("user"))):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         if not len(data.videos):
             videos = []
         else:
@@ -266,27 +250,21 @@ async def create_playlist(data: PlaylistCreate, current_user: dict = Depends(JWT
             except bson_errors.InvalidId:
                 raise HTTPException(status_code=400, detail="Invalid video ID format")
 
-        playlist_name = "My Playlist" if data.name.lower() != "my playlist" else data.name.title()
-
         playlist_attributes = {
             "playlist_id": str(generate_unique_id()),
-            "name": playlist_name, # Name is hard coded to my playlist otherwise data.name
+            "name": data.name,
             "videos": videos
         }
 
-        # Invalidate user playlist cache
-        cache_key = process_cache_key()
-        await cache.h_del(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
-
         # Create the playlist for user
         result  = await playlist_service.create_playlist(current_user.get("id"), playlist_attributes)
 
         if not result :
             raise HTTPException(status_code=500, detail="Failed to create playlist")
 
-        # Invalidate user playlist cache
+        # Invalidate every cached page of the user's playlists
         cache_key = process_cache_key()
-        await cache.h_del(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
+        await cache.invalidate(cache_key, "user_playlist_contents", current_user.get("id"))
 
          # Success response
         return {
@@ -294,6 +272,8 @@ async def create_playlist(data: PlaylistCreate, current_user: dict = Depends(JWT
             "detail": "Playlist created successfully",
             "playlist_id": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -304,19 +284,16 @@ async def add_video_to_playlist(
     current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Add the video to the user's playlist with given video ID
         result = await playlist_service.add_video_to_playlist(
             current_user.get("id"),
-            data.video_id
+            data.video_id,
+            data.playlist_id
         )
 
-        # Invalidate user playlist cache
-        cache_key = process_cache_key()
-        await cache.h_del(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
+        # Invalidate the cached pages the appended video lands on
+        if not result["already_exists"]:
+            await playlist_service.invalidate_contents(current_user.get("id"), result["playlist_id"])
 
         # Return success response
         return {
@@ -335,19 +312,16 @@ async def remove_video_from_playlist(
     current_user: dict = Depends(JWTAuthGuard("user"))
 ):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Remove the video from playlist with given video id
         result = await playlist_service.remove_video_from_playlist(
             current_user.get("id"),
-            data.video_id
+            data.video_id,
+            data.playlist_id
         )
 
-        # Invalidate user playlist cache
-        cache_key = process_cache_key()
-        await cache.h_del(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
+        # Invalidate the cached pages the removal shifts
+        if result["position"] is not None:
+            await playlist_service.invalidate_contents(current_user.get("id"), result["playlist_id"], result["position"])
 
         # Success response
         return {
@@ -361,64 +335,48 @@ async def remove_video_from_playlist(
 
 # Remove an existing playlist of the user
 @userRouter.delete("/manage/playlists", response_model=UserResponse)
-async def delete_playlist(current_user: dict = Depends(JWTAuthGuard("user"))):
+async def delete_playlist(
+        playlist_id: str = Query(None, max_length=64, description="Playlist to remove, the oldest when omitted"),
+        current_user: dict = Depends(JWTAuthGuard("user"))
+):
     try:
-        user = await user_service.get_user_details_by_id(current_user.get("id"))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Remove the playlist for user
-        result  = await playlist_service.remove_playlist(current_user.get("id"))
+        result  = await playlist_service.remove_playlist(current_user.get("id"), playlist_id)
 
         if not result :
             raise HTTPException(status_code=500, detail="Failed to remove playlist")
 
-        # Invalidate user playlist cache
+        # Invalidate every cached page of the user's playlists
         cache_key = process_cache_key()
-        await cache.h_del(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
+        await cache.invalidate(cache_key, "user_playlist_contents", current_user.get("id"))
 
          # Success response
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Playlist contents retrieval
 @userRouter.get("/playlist/contents", response_model=PlaylistContentsResponse)
-async def get_playlist_contents(current_user: dict = Depends(JWTAuthGuard("user"))):
+async def get_playlist_contents(
+        playlist_id: str = Query(None, max_length=64, description="Playlist to read, the oldest when omitted"),
+        page: int = Query(1, ge=1, le=1000, description="Page number for pagination"),
+        page_size: int = Query(50, ge=1, le=100, description="Number of videos per page"),
+        cursor: str = Query(None, max_length=512, description="Cursor from a previous page's next_cursor; overrides page"),
+        current_user: dict = Depends(JWTAuthGuard("user"))
+):
     try:
-        cache_key = process_cache_key()
-
-        # Check cache with user-specific key
-        cached_playlist = await cache.h_get(cache_key, "user_playlist_contents", {"user_id": current_user.get("id")})
-        if cached_playlist is not None:
-            return cached_playlist
-
-        # Fetch user playlist details
-        user_playlist = await playlist_service.get_user_playlist_details(current_user.get("id"))
+        # One page of the playlist in playlist order, cached per page
+        play_list_result = await playlist_service.get_playlist_contents(current_user.get("id"), playlist_id, page, page_size, cursor)
 
         # Check if playlist has videos
-        if not user_playlist:
+        if not play_list_result or not play_list_result["total"]:
             raise HTTPException(status_code=404, detail="No contents found in the playlist")
 
-        playlist_id = user_playlist.get("playlist_id", "")
-        name = user_playlist.get("name", "")
-        user_video_ids = list(map(str, user_playlist.get("videos", [])))
-
-        playlist_videos = await audio_stories_service.get_audio_stories_by_ids(user_video_ids)
-
-        if not playlist_videos:
-            raise HTTPException(status_code=404, detail="No videos found in the playlist")
-
-        play_list_result = {
-            "playlist_id": playlist_id,
-            "name": name,
-            "playlist_items": playlist_videos
-        }
-
-        # Set playlist contents in cache
-        await cache.h_set(cache_key, "user_playlist_contents", play_list_result, {"user_id": current_user.get("id")})
-
         # Return the playlist contents
         return play_list_result
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -6,6 +6,7 @@ from .user_service import UserService
 from .password_reset_service import PasswordResetService
 from .page_service import PageService
 from .playlist_service import PlaylistService
+from .counter_service import CounterService
 
 __all__ = [
     'AdminService',
@@ -14,5 +15,6 @@ __all__ = [
     'UserService',
     'PasswordResetService',
     'PageService',
-    'PlaylistService'
+    'PlaylistService',
+    'CounterService'
 ]
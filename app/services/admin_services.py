@@ -5,6 +5,7 @@ from fastapi import HTTPException
 from bson import ObjectId, errors as bson_errors
 from app.services.base_service import BaseService
 from typing import Optional
+from utils.helpers import get_current_iso_timestamp
 
 class AdminService(BaseService):
     def __init__(self):
@@ -51,6 +52,20 @@ class AdminService(BaseService):
             self.logger.error("Unexpected error in %s for email %s: %s", "find_admin_with_email", email, e)
             raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching admin data")
 
+    # Replace a admin password hash after a work factor change, unless the password changed meanwhile
+    async def update_password_hash(self, admin_id: str, old_hash: str, new_hash: str) -> bool:
+        try:
+            result = await self.db.admins.update_one(
+                {"_id": ObjectId(admin_id), "password_hash": old_hash},
+                {"$set": {"password_hash": new_hash, "updated_at": get_current_iso_timestamp()}}
+            )
+            if result.modified_count:
+                self.logger.info("Password hash upgraded for admin ID %s", admin_id)
+            return bool(result.modified_count)
+        except (PyMongoError, bson_errors.InvalidId) as e:
+            self.logger.error("Error in %s for ID %s: %s", "update_password_hash", admin_id, e)
+            return False
+
     # Get admin profile by ID
     async def get_admin_by_id(self, admin_id: str) -> Optional[dict]:
         try:
@@ -1,15 +1,20 @@
 # audio_stories_service.py
+import asyncio
 from typing import Optional
 from fastapi import HTTPException
+from pymongo import ReturnDocument
 from pymongo.errors import PyMongoError
 from app.services.base_service import BaseService
+from app.services.channel_catalog import channel_catalog
+from app.services.counter_service import CounterService
 from bson import ObjectId, errors as bson_errors
-from utils.helpers import get_current_iso_timestamp
-from fastapi.encoders import jsonable_encoder
+from db.counters import CHANNEL_READY_STORIES
+from utils.helpers import get_current_iso_timestamp, encode_cursor, build_keyset_filter, build_page_pipeline
 
 class AudioStoriesService(BaseService):
     def __init__(self):
         super().__init__()
+        self.counters = CounterService()
 
     # Create a new audio story
     async def create_audio_story(self, story_data: dict, created_by: str) -> Optional[dict]:
@@ -28,6 +33,8 @@ class AudioStoriesService(BaseService):
             data_dict["updated_at"] = timestamp
 
             result = await self.db.audio_stories.insert_one(data_dict)
+            if data_dict.get("is_ready"):
+                await self.counters.adjust_channel_stories(data_dict["channel_id"], 1)
 
             self.logger.info(
                 "Audio story created with ID %s for channel %s",
@@ -64,19 +71,25 @@ class AudioStoriesService(BaseService):
     # Delete an audio story
     async def delete_audio_story(self, channel_id: str, story_id: str) -> bool:
         try:
-            result = await self.db.audio_stories.delete_one(
+            deleted = await self.db.audio_stories.find_one_and_delete(
                 {
                     "_id": ObjectId(story_id),
                     "channel_id": ObjectId(channel_id),
-                }
+                },
+                projection={"is_ready": 1}
             )
-            if result.deleted_count == 0:
+            if deleted is None:
                 self.logger.warning("No audio story found to delete for ID %s", story_id)
                 raise HTTPException(status_code=404, detail="Audio story not found")
 
+            if deleted.get("is_ready"):
+                await self.counters.adjust_channel_stories(ObjectId(channel_id), -1)
+
             self.logger.info("Deleted audio story with ID %s", story_id)
             return True
 
+        except HTTPException:
+            raise
         except bson_errors.InvalidId:
             self.logger.warning("Invalid audio story ID provided for delete: %s", story_id)
             raise HTTPException(status_code=400, detail="Invalid audio story ID")
@@ -93,7 +106,8 @@ class AudioStoriesService(BaseService):
     # Mark an audio story as ready with metadata
     async def mark_ready(self, channel_id: str, file_path: str, meta_info: dict) -> bool:
         try:
-            result = await self.db.audio_stories.update_one(
+            # The pre-update document tells whether this call is the one making the story ready
+            previous = await self.db.audio_stories.find_one_and_update(
                 {"channel_id": ObjectId(channel_id), "file_path": file_path},
                 {
                     "$set": {
@@ -102,9 +116,14 @@ class AudioStoriesService(BaseService):
                         "updated_at": get_current_iso_timestamp(),
                     }
                 },
+                projection={"is_ready": 1},
+                return_document=ReturnDocument.BEFORE,
             )
 
-            if result.modified_count == 0:
+            if previous is not None and not previous.get("is_ready"):
+                await self.counters.adjust_channel_stories(ObjectId(channel_id), 1)
+
+            if previous is None:
                 self.logger.warning(
                     "No audio story updated as ready for channel %s with file %s",
                     channel_id,
@@ -141,78 +160,175 @@ class AudioStoriesService(BaseService):
             )
             raise HTTPException(status_code=500, detail="Could not update audio story as ready")
 
+    # Aggregation for one page of a channel's ready stories, newest first
+    def build_story_page_pipeline(self, channel_id: ObjectId, skip: int, limit: int, cursor: str = None) -> list:
+        return build_page_pipeline(
+            {"channel_id": channel_id, "is_ready": True},
+            {"created_at": -1, "_id": -1},
+            0 if cursor else skip,
+            limit,
+            {"_id": 1, "channel_id": 1, "meta_details": 1, "created_at": 1},
+            build_keyset_filter("created_at", cursor, descending=True) if cursor else None
+        )
+
+    # Shape one page of stories as a PaginatedAudioResponse
+    def format_story_page(self, rows: list, total: int, channel_id: str, page: int, page_size: int, cursor: str = None) -> dict:
+        stories = []
+        for story in rows:
+            try:
+                stories.append({
+                    "id": str(story["_id"]),
+                    "channel_id": str(story.get("channel_id", channel_id)),
+                    "meta_details": story.get("meta_details", {})
+                })
+            except KeyError as e:
+                self.logger.warning("Missing expected field in story: %s", e)
+                continue  # Skip malformed documents
+
+        self.logger.info(
+            "Fetched %d stories for channel %s (page %s, page_size %d, total: %s)",
+            len(stories), channel_id, "cursor" if cursor else page, page_size, total
+        )
+
+        last = rows[-1] if len(rows) == page_size else None
+        return {
+            "total": total,
+            "page": None if cursor else page,
+            "page_size": page_size,
+            "total_pages": self.counters.count_pages(total, page_size),
+            "next_cursor": encode_cursor(last.get("created_at"), last["_id"]) if last else None,
+            "data": stories
+        }
+
+    # Page rows and total of a channel's ready stories, per the configured total mode
+    async def fetch_story_page(self, channel_oid: ObjectId, skip: int, page_size: int, cursor: str = None, ready_count: int = None) -> tuple:
+        if self.counters.estimated:
+            pipeline = self.build_story_page_pipeline(channel_oid, skip, page_size + 1, cursor)
+            rows = await self.db.audio_stories.aggregate(pipeline).to_list(length=None)
+            return rows[:page_size], self.counters.estimate_total(skip, len(rows), cursor)
+
+        pipeline = self.build_story_page_pipeline(channel_oid, skip, page_size, cursor)
+
+        # Exact mode counts on the index while the page is read
+        if self.counters.total_mode == "exact":
+            rows, total = await asyncio.gather(
+                self.db.audio_stories.aggregate(pipeline).to_list(length=None),
+                self.counters.count_channel_stories(channel_oid)
+            )
+            return rows, total
+
+        rows = await self.db.audio_stories.aggregate(pipeline).to_list(length=None)
+        if ready_count is None:
+            ready_count = await self.counters.count_channel_stories(channel_oid)
+        return rows, max(0, ready_count)
+
     # Get audio stories by channel ID with pagination
-    async def get_audio_story_by_channel_id(self, channel_id: str, page: int = 1, page_size: int = 10) -> Optional[
+    async def get_audio_story_by_channel_id(self, channel_id: str, page: int = 1, page_size: int = 10, cursor: str = None) -> Optional[
         dict]:
         try:
-            skip = (page - 1) * page_size
-
             # Validate inputs
             if page < 1:
                 page = 1
             if page_size < 1 or page_size > 100:
                 page_size = 10  # Set reasonable limits
 
-            query = {"channel_id": ObjectId(channel_id), "is_ready": True}
-            projection = {"_id": 1, "channel_id": 1, "meta_details": 1, "created_at": 1}  # Added channel_id
-
-            # Count total matching stories
-            total_stories = await self.db.audio_stories.count_documents(query)
-
-            # If no stories found, return empty response instead of error
-            if total_stories == 0:
-                self.logger.info("No audio stories found for channel ID %s", channel_id)
-                return {
-                    "total": 0,
-                    "page": page,
-                    "page_size": page_size,
-                    "total_pages": 0,
-                    "data": []
-                }
+            skip = (page - 1) * page_size
+            rows, total_stories = await self.fetch_story_page(ObjectId(channel_id), skip, page_size, cursor)
+            return self.format_story_page(rows, total_stories, channel_id, page, page_size, cursor)
 
-            # Fetch paginated results sorted by created_at DESC
-            cursor = (
-                self.db.audio_stories
-                .find(query, projection)
-                .sort("created_at", -1)
-                .skip(skip)
-                .limit(page_size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.logger.error(
+                "Error in get_audio_story_by_channel_id for channel %s: %s",
+                channel_id, str(e)
             )
+            raise HTTPException(status_code=500, detail=f"Could not fetch audio stories for channel {channel_id}")
 
-            result = await cursor.to_list(length=page_size)
+    # Channel summary included with a page of its stories
+    def build_channel_info(self, channel: dict) -> dict:
+        return {
+            "youtube_channel_id": channel.get("youtube_channel_id", ""),
+            "title": channel.get("title", "No title available"),
+            "description": channel.get("description", "No description available"),
+            "thumbnail_url": channel.get("thumbnail_url", "https://example.com/default_thumbnail.png")
+        }
+
+    # Get a page of a channel's stories together with the channel info in a single aggregation
+    async def get_channel_stories_page(self, channel_id: str, page: int = 1, page_size: int = 10, cursor: str = None) -> dict:
+        try:
+            skip = (page - 1) * page_size
+            channel_oid = ObjectId(channel_id)
 
-            # Convert ObjectId to str and format response
-            stories = []
-            for story in result:
-                try:
-                    story_data = {
-                        "id": str(story["_id"]),
-                        "channel_id": str(story.get("channel_id", channel_id)),
-                        "meta_details": story.get("meta_details", {})
-                    }
-                    stories.append(story_data)
-                except KeyError as e:
-                    self.logger.warning("Missing expected field in story: %s", e)
-                    continue  # Skip malformed documents
+            # A channel in this worker's catalog is known active, only the stories need a query
+            channel = channel_catalog.get(channel_id)
+            if channel is not None:
+                rows, total_stories = await self.fetch_story_page(channel_oid, skip, page_size, cursor, channel.get(CHANNEL_READY_STORIES))
+                stories = self.format_story_page(rows, total_stories, channel_id, page, page_size, cursor)
+                stories["channel_info"] = self.build_channel_info(channel)
+                return stories
 
-            self.logger.info(
-                "Fetched %d stories for channel %s (page %d, page_size %d, total: %d)",
-                len(stories), channel_id, page, page_size, total_stories
-            )
+            exact, estimated = self.counters.total_mode == "exact", self.counters.estimated
+            limit = page_size + 1 if estimated else page_size
 
-            return {
-                "total": total_stories,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_stories + page_size - 1) // page_size,
-                "data": stories
-            }
+            # In counter mode the total is the channel's own ready_story_count, read by the same query
+            pipeline = [
+                {"$match": {"_id": channel_oid}},
+                {
+                    "$lookup": {
+                        "from": "audio_stories",
+                        "pipeline": self.build_story_page_pipeline(channel_oid, skip, limit, cursor),
+                        "as": "stories"
+                    }
+                },
+                {
+                    "$project": {
+                        "youtube_channel_id": 1,
+                        "title": 1,
+                        "description": 1,
+                        "thumbnail_url": 1,
+                        "is_active": 1,
+                        CHANNEL_READY_STORIES: 1,
+                        "stories": 1
+                    }
+                }
+            ]
+            page_query = self.db.channels.aggregate(pipeline).to_list(length=1)
+            if exact:
+                # Counted on the index while the page is read
+                result, exact_total = await asyncio.gather(page_query, self.counters.count_channel_stories(channel_oid))
+            else:
+                result = await page_query
+
+            if not result:
+                self.logger.warning("Channel not found for ID %s", channel_id)
+                raise HTTPException(status_code=404, detail="Channel not found")
+            channel = result[0]
+            if not channel.get("is_active", True):
+                raise HTTPException(status_code=404, detail="Channel is not active")
+
+            if exact:
+                rows, total_stories = channel["stories"], exact_total
+            elif estimated:
+                rows = channel["stories"][:page_size]
+                total_stories = self.counters.estimate_total(skip, len(channel["stories"]), cursor)
+            else:
+                rows = channel["stories"]
+                total_stories = channel.get(CHANNEL_READY_STORIES)
+                if total_stories is None:
+                    total_stories = await self.counters.count_channel_stories(channel_oid)
 
-        except Exception as e:
-            self.logger.error(
-                "Error in get_audio_story_by_channel_id for channel %s: %s",
-                channel_id, str(e)
-            )
+            stories = self.format_story_page(rows, total_stories if estimated else max(0, total_stories), channel_id, page, page_size, cursor)
+            stories["channel_info"] = self.build_channel_info(channel)
+            return stories
+
+        except HTTPException:
+            raise
+        except bson_errors.InvalidId:
+            self.logger.warning("Invalid channel ID provided: %s", channel_id)
+            raise HTTPException(status_code=400, detail="Invalid channel ID")
+        except PyMongoError as e:
+            self.logger.error("Error in %s for channel %s: %s", "get_channel_stories_page", channel_id, e)
             raise HTTPException(status_code=500, detail=f"Could not fetch audio stories for channel {channel_id}")
 
     # Get audio story file by ID
@@ -232,60 +348,3 @@ class AudioStoriesService(BaseService):
                 "Error in get_audio_story_by_id for ID %s: %s", story_id, e, exc_info=True
             )
             raise HTTPException(status_code=500, detail="Could not fetch audio story data")
-
-    # Get multiple audio stories by their IDs with channel info
-    async def get_audio_stories_by_ids(self, video_ids: list[str]):
-        try:
-            object_ids = [
-                ObjectId(vid)
-                for vid in video_ids
-                if ObjectId.is_valid(vid)
-            ]
-
-            if not object_ids:
-                return []
-
-            pipeline = [
-                {
-                    "$match": {
-                        "_id": {"$in": object_ids}
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "channels",
-                        "localField": "channel_id",
-                        "foreignField": "_id",
-                        "as": "channel"
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$channel",
-                        "preserveNullAndEmptyArrays": False
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 0,
-                        "file_path": 1,
-                        "file_name": 1,
-                        "meta_details": 1,
-                        "channel": {
-                            "youtube_channel_id": "$channel.youtube_channel_id",
-                            "title": "$channel.title",
-                            "thumbnail_url": "$channel.thumbnail_url"
-                        }
-                    }
-                }
-            ]
-
-            cursor = self.db.audio_stories.aggregate(pipeline)
-            result = await cursor.to_list(length=None)
-            return jsonable_encoder(result)
-        except PyMongoError as e:
-            self.logger.error("Mongo error fetching audio stories: %s", e)
-            raise HTTPException(status_code=500, detail="Database error")
-        except Exception as e:
-            self.logger.error("Unexpected error fetching audio stories: %s", e)
-            raise HTTPException(status_code=500, detail="Internal server error")
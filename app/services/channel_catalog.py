@@ -0,0 +1,186 @@
+# channel_catalog.py
+import asyncio
+import bisect
+import logging
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from config import config
+from db import db
+from db.counters import CHANNEL_READY_STORIES
+
+# Fields kept for every active channel
+CATALOG_PROJECTION = {
+    "_id": 1,
+    "youtube_channel_id": 1,
+    "title": 1,
+    "order_position": 1,
+    "thumbnail_url": 1,
+    "description": 1,
+    "is_active": 1,
+    CHANNEL_READY_STORIES: 1,
+}
+
+# Returned by mongod when change streams are unavailable (standalone server)
+CHANGE_STREAM_UNSUPPORTED = {40573, 40415}
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable view of the active channels, sorted by (order_position, _id)."""
+
+    channels: tuple
+    keys: tuple
+    by_id: MappingProxyType
+
+    # Index of the first channel sorting after the given (order_position, _id) key
+    def position_after(self, order_position, channel_id: ObjectId) -> int:
+        return bisect.bisect_right(self.keys, (order_position or 0, channel_id))
+
+# Sort key of a channel document; a missing or null order_position sorts as 0 instead of failing to compare
+def catalog_key(channel: dict) -> tuple:
+    return channel.get("order_position") or 0, channel["_id"]
+
+# Build a snapshot from channel documents
+def build_snapshot(documents) -> CatalogSnapshot:
+    channels = tuple(MappingProxyType(dict(document)) for document in sorted(documents, key=catalog_key))
+    return CatalogSnapshot(
+        channels=channels,
+        keys=tuple(catalog_key(channel) for channel in channels),
+        by_id=MappingProxyType({channel["_id"]: channel for channel in channels}),
+    )
+
+class ChannelCatalog:
+    """Per-worker in-memory catalog of active channels.
+
+    Loaded at startup and kept current from a change stream on ``channels``;
+    on a standalone mongod, where change streams are unavailable, it is
+    reloaded every ``poll_interval`` seconds instead. Readers get the current
+    snapshot, which is replaced, never mutated, so no locking is needed.
+    Response bodies rendered from a snapshot are kept until it is replaced.
+    """
+
+    def __init__(self, database=db):
+        self.database = database
+        self.poll_interval = config["channel_catalog_poll_interval"]
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.documents = {}
+        self.task = None
+        self.stale = asyncio.Event()
+        self.max_bodies = 512
+        self.bodies = OrderedDict()
+        self.bodies_snapshot = None
+
+    # Whether a snapshot has been loaded
+    @property
+    def ready(self) -> bool:
+        return self.snapshot is not None
+
+    # Active channel by id, None when unknown or not loaded
+    def get(self, channel_id) -> Optional[dict]:
+        snapshot = self.snapshot
+        if snapshot is None or not ObjectId.is_valid(channel_id):
+            return None
+        channel = snapshot.by_id.get(ObjectId(channel_id))
+        return dict(channel) if channel is not None else None
+
+    # A value derived only from the given snapshot, built once per snapshot and key (bounded LRU)
+    def rendered(self, snapshot: CatalogSnapshot, key: tuple, build):
+        if self.bodies_snapshot is not snapshot:
+            self.bodies.clear()
+            self.bodies_snapshot = snapshot
+
+        body = self.bodies.get(key)
+        if body is not None:
+            self.bodies.move_to_end(key)
+            return body
+
+        body = self.bodies[key] = build()
+        while len(self.bodies) > self.max_bodies:
+            self.bodies.popitem(last=False)
+        return body
+
+    # Load the catalog, then keep it fresh in the background
+    async def start(self):
+        try:
+            await self.load()
+        except PyMongoError as e:
+            self.logger.error("Initial channel catalog load failed: %s", e)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    # Stop the background refresh
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    # Ask for a reload soon, used by this worker's own channel writes while polling
+    def mark_stale(self):
+        self.stale.set()
+
+    # Replace the catalog with every active channel in the database
+    async def load(self):
+        cursor = self.database.channels.find({"is_active": True}, CATALOG_PROJECTION)
+        self.documents = {document["_id"]: document async for document in cursor}
+        self.snapshot = build_snapshot(self.documents.values())
+        self.logger.info("Channel catalog loaded with %d active channels", len(self.documents))
+
+    # Apply one change stream event
+    def apply(self, change: dict):
+        operation = change["operationType"]
+        if operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            raise RuntimeError(f"channels change stream ended by {operation}")
+
+        channel_id = change["documentKey"]["_id"]
+        document = change.get("fullDocument")
+        if operation in ("insert", "update", "replace") and document and document.get("is_active"):
+            self.documents[channel_id] = {field: document[field] for field in CATALOG_PROJECTION if field in document}
+        elif self.documents.pop(channel_id, None) is None:
+            return
+
+        self.snapshot = build_snapshot(self.documents.values())
+
+    # Follow the change stream, falling back to polling when the server has none
+    async def run(self):
+        while True:
+            try:
+                async with self.database.channels.watch(full_document="updateLookup") as stream:
+                    # Loaded after the stream opens, so no change can fall between the two
+                    await self.load()
+                    async for change in stream:
+                        self.apply(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED:
+                    self.logger.info("Change streams unavailable, polling channels every %ss", self.poll_interval)
+                    await self.poll()
+                    return
+                self.logger.warning("[run] Channel change stream failed: %s", e)
+                await asyncio.sleep(1)
+            except Exception as e:
+                self.logger.warning("[run] Channel change stream failed: %s", e)
+                await asyncio.sleep(1)
+
+    # Reload every poll_interval seconds, or sooner after a local write
+    async def poll(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.stale.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.stale.clear()
+
+            try:
+                await self.load()
+            except PyMongoError as e:
+                self.logger.warning("[poll] Channel catalog reload failed: %s", e)
+
+# Shared by the channel routes of this worker
+channel_catalog = ChannelCatalog()
@@ -1,89 +1,149 @@
 # channel_service.py
+import asyncio
 from typing import Optional
 from fastapi import HTTPException
+from pymongo import UpdateOne
 from pymongo.errors import PyMongoError
 from bson import ObjectId, errors as bson_errors
 from app.services.base_service import BaseService
-from utils.helpers import get_current_iso_timestamp
+from app.services.channel_catalog import channel_catalog
+from app.services.counter_service import CounterService
+from app.services.data_loader import channel_documents
+from common import RedisHashCache
+from config import config
+from db.counters import CHANNEL_READY_STORIES
+from utils.helpers import get_current_iso_timestamp, process_cache_key, encode_cursor, decode_cursor, build_keyset_filter, build_page_pipeline
 
 class ChannelService(BaseService):
     def __init__(self):
         super().__init__()
+        self.cache = RedisHashCache(prefix=config["cache_prefix"])
+        self.cache_key = process_cache_key()
+        self.counters = CounterService()
+        self.order_mode = config["channel_order_mode"]
+        self.order_min_gap = config["channel_order_min_gap"]
+        self.move_attempts = 3  # Plans of a fractional move before giving up on a concurrently changing order
+        self.rebalance_task = None
 
-    # List active channels with pagination
-    async def list_active_channels(self, page: int = 1, page_size: int = 10) -> Optional[dict]:
-        try:
-            skip = (page - 1) * page_size
-
-            query = {"is_active": True}
-            projection = {
+    # Aggregation for one page of active channels; cursor mode seeks past the last item instead of skipping
+    def build_channel_page_pipeline(self, skip: int, limit: int, cursor: str = None) -> list:
+        return build_page_pipeline(
+            {"is_active": True},
+            {"order_position": 1, "_id": 1},
+            0 if cursor else skip,
+            limit,
+            {
                 "_id": 1,
                 "youtube_channel_id": 1,
                 "title": 1,
                 "order_position": 1,
                 "thumbnail_url": 1,
                 "description": 1
-            }
-
-            # Count total documents
-            total_channels = await self.db.channels.count_documents(query)
-
-            # Fetch paginated results
-            cursor = (self.db.channels.find(query, projection)
-                      .sort("order_position", 1)
-                      .skip(skip)
-                      .limit(page_size))
-            result = await cursor.to_list(length=page_size)
-
-            channels = []
-            for ch in result:
-                channels.append({
-                    "channel_id": str(ch["_id"]),
-                    "youtube_channel_id": ch["youtube_channel_id"],
-                    "title": ch["title"],
-                    "is_active": ch.get("is_active", True),
-                    "order_position": ch["order_position"],
-                    "description": ch.get("description") or "No description available",
-                    "thumbnail_url": ch.get("thumbnail_url") or "https://example.com/default_thumbnail.png",
-                    "status": True
-                })
-
-            self.logger.info(
-                "Fetched %d active channels (page %d, page_size %d)", len(channels), page, page_size
-            )
+            },
+            build_keyset_filter("order_position", cursor) if cursor else None
+        )
+
+    # List active channels with page-number or cursor (order_position, _id) pagination
+    async def list_active_channels(self, page: int = 1, page_size: int = 10, cursor: str = None) -> Optional[dict]:
+        try:
+            skip = (page - 1) * page_size
+
+            # Served from this worker's catalog without any I/O once it is loaded
+            snapshot = channel_catalog.snapshot
+            if snapshot is not None:
+                return self.format_snapshot_page(snapshot, page, page_size, cursor)
 
-            return {
-                "total": total_channels,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total_channels + page_size - 1) // page_size,
-                "data": channels
-            }
+            estimated = self.counters.estimated
+            pipeline = self.build_channel_page_pipeline(skip, page_size + 1 if estimated else page_size, cursor)
+
+            if estimated:
+                rows = await self.db.channels.aggregate(pipeline).to_list(length=None)
+                result, total_channels = rows[:page_size], self.counters.estimate_total(skip, len(rows), cursor)
+            else:
+                # Channels keep an exact count on the index, read while the page is, in every total mode: the collection
+                # is small enough to fit the in-memory catalog, and this path only runs while the catalog is unloaded or disabled
+                result, total_channels = await asyncio.gather(
+                    self.db.channels.aggregate(pipeline).to_list(length=None),
+                    self.db.channels.count_documents({"is_active": True})
+                )
+
+            return self.format_channel_page(result, total_channels, page, page_size, cursor)
 
         except PyMongoError as e:
             self.logger.error("Error in %s: %s", "list_active_channels", e)
             raise HTTPException(status_code=500, detail="Could not fetch channel data")
 
+    # One page of a catalog snapshot as a PaginatedChannelsResponse
+    def format_snapshot_page(self, snapshot, page: int, page_size: int, cursor: str = None) -> dict:
+        start = snapshot.position_after(*decode_cursor(cursor)) if cursor else (page - 1) * page_size
+        result = list(snapshot.channels[start:start + page_size])
+        return self.format_channel_page(result, len(snapshot.channels), page, page_size, cursor)
+
+    # Response body of a catalog page, rendered once per snapshot, page and page size
+    def render_catalog_page(self, render, page: int = 1, page_size: int = 10, cursor: str = None) -> tuple:
+        snapshot = channel_catalog.snapshot
+        key = ("cursor", cursor, page_size) if cursor else ("page", page, page_size)
+        return channel_catalog.rendered(snapshot, key, lambda: render(self.format_snapshot_page(snapshot, page, page_size, cursor)))
+
+    # Shape one page of channels as a PaginatedChannelsResponse
+    def format_channel_page(self, result: list, total_channels: int, page: int, page_size: int, cursor: str = None) -> dict:
+        channels = []
+        for ch in result:
+            channels.append({
+                "channel_id": str(ch["_id"]),
+                "youtube_channel_id": ch["youtube_channel_id"],
+                "title": ch["title"],
+                "is_active": ch.get("is_active", True),
+                "order_position": ch["order_position"],
+                "description": ch.get("description") or "No description available",
+                "thumbnail_url": ch.get("thumbnail_url") or "https://example.com/default_thumbnail.png",
+                "status": True
+            })
+
+        self.logger.info(
+            "Fetched %d active channels (page %s, page_size %d)", len(channels), "cursor" if cursor else page, page_size
+        )
+
+        last = result[-1] if len(result) == page_size else None
+        return {
+            "total": total_channels,
+            "page": None if cursor else page,
+            "page_size": page_size,
+            "total_pages": self.counters.count_pages(total_channels, page_size),
+            "next_cursor": encode_cursor(last["order_position"], last["_id"]) if last else None,
+            "data": channels
+        }
+
+    # Find an active channel, from this worker's catalog when it has it
+    async def find_active_channel(self, channel_id: str) -> Optional[dict]:
+        channel = channel_catalog.get(channel_id)
+        if channel is not None:
+            return channel
+
+        # Not in the catalog: unknown, inactive, or created since the last refresh
+        channel = await self.find_channel_by_id(channel_id)
+        if not channel.get("is_active", True):
+            raise HTTPException(status_code=404, detail="Channel not found")
+        return channel
+
     # Find a channel by its ID
     async def find_channel_by_id(self, channel_id: str) -> Optional[dict]:
         try:
-            channel = await self.db.channels.find_one(
-                {"_id": ObjectId(channel_id)},
-                {
-                    "_id": 1,
-                    "youtube_channel_id": 1,
-                    "title": 1,
-                    "order_position": 1,
-                    "thumbnail_url": 1,
-                    "description": 1,
-                    "is_active": 1,
-                 }
-            )
+            object_id = ObjectId(channel_id)
+
+            # Ids recently found missing skip the database
+            if await self.cache.is_missing(self.cache_key, "channel", str(object_id)):
+                self.logger.warning("Channel not found for ID %s (cached)", channel_id)
+                raise HTTPException(status_code=404, detail="Channel not found")
+
+            # Batched with concurrent lookups and loaded once per request
+            channel = await channel_documents.load(object_id)
             if channel:
                 self.logger.info("Channel found for ID %s", channel_id)
                 return channel
             else:
                 self.logger.warning("Channel not found for ID %s", channel_id)
+                await self.cache.mark_missing(self.cache_key, "channel", str(object_id))
                 raise HTTPException(status_code=404, detail="Channel not found")
         except bson_errors.InvalidId:
             self.logger.warning("Invalid channel ID provided: %s", channel_id)
@@ -106,8 +166,11 @@ class ChannelService(BaseService):
             data_dict["created_at"] = timestamp
             data_dict["updated_at"] = timestamp
             data_dict["published_at"] = timestamp
+            data_dict[CHANNEL_READY_STORIES] = 0
 
             result = await self.db.channels.insert_one(data_dict)
+            channel_catalog.mark_stale()
+            await self.cache.clear_missing(self.cache_key, "channel", str(result.inserted_id))
             self.logger.info("Channel created successfully with ID %s", str(result.inserted_id))
             return {"channel_id": str(result.inserted_id), "created_at": timestamp, "status": True}
         except PyMongoError as e:
@@ -122,6 +185,8 @@ class ChannelService(BaseService):
                 {"_id": ObjectId(channel_id)},
                 {"$set": update_data}
             )
+            channel_documents.clear(ObjectId(channel_id))
+            channel_catalog.mark_stale()
 
             if result.modified_count == 0:
                 self.logger.warning("No channel updated for ID %s", channel_id)
@@ -138,6 +203,11 @@ class ChannelService(BaseService):
 
     # Set the order position of a channel
     async def set_channel_order(self, channel_id: str, order_position: int) -> Optional[dict]:
+        # Fractional mode writes only the moved channel. Shift mode's range update and final write are separate,
+        # non-transactional writes, so concurrent reorders can leave duplicate or missing positions there
+        if self.order_mode == "fractional":
+            return await self.move_channel(channel_id, order_position)
+
         try:
             current_channel = await self.db.channels.find_one({"_id": ObjectId(channel_id)})
             if not current_channel:
@@ -162,6 +232,9 @@ class ChannelService(BaseService):
                     {"$inc": {"order_position": -1}}
                 )
 
+            # Positions of other channels shift too
+            channel_documents.clear()
+
             # Finally update this channel
             result = await self.db.channels.update_one(
                 {"_id": ObjectId(channel_id)},
@@ -172,6 +245,7 @@ class ChannelService(BaseService):
                     }
                 }
             )
+            channel_catalog.mark_stale()
 
             if result.modified_count == 0:
                 raise HTTPException(status_code=404, detail="No changes made")
@@ -182,3 +256,158 @@ class ChannelService(BaseService):
             raise HTTPException(status_code=400, detail="Invalid channel ID")
         except PyMongoError as e:
             raise HTTPException(status_code=500, detail="Could not update channel order position")
+
+    # Neighbours a channel moved to a 1-based slot would sit between, and the position halfway between them
+    async def plan_move(self, object_id: ObjectId, order_position: int) -> tuple:
+        others = {"_id": {"$ne": object_id}}
+        order = [("order_position", 1), ("_id", 1)]
+        neighbours = await (self.db.channels.find(others, {"order_position": 1})
+                            .sort(order)
+                            .skip(max(order_position - 2, 0))
+                            .limit(1 if order_position <= 1 else 2)
+                            .to_list(length=2))
+
+        if order_position <= 1:
+            lower, upper = None, neighbours[0] if neighbours else None
+        elif neighbours:
+            lower, upper = neighbours[0], neighbours[1] if len(neighbours) > 1 else None
+        else:
+            # Past the end: place after the current last channel
+            last = await self.db.channels.find(others, {"order_position": 1}).sort([("order_position", -1), ("_id", -1)]).limit(1).to_list(length=1)
+            lower, upper = (last[0] if last else None), None
+
+        lower_position = lower.get("order_position") if lower else None
+        upper_position = upper.get("order_position") if upper else None
+        if lower_position is None and upper_position is None:
+            new_position = 1
+        elif lower_position is None:
+            new_position = upper_position - 1
+        elif upper_position is None:
+            new_position = lower_position + 1
+        else:
+            new_position = (lower_position + upper_position) / 2
+        return lower, upper, new_position
+
+    # Whether the neighbours a move was planned against still hold the positions it read
+    async def neighbours_unchanged(self, *neighbours) -> bool:
+        expected = {neighbour["_id"]: neighbour.get("order_position") for neighbour in neighbours if neighbour}
+        if not expected:
+            return True
+
+        current = await self.db.channels.find({"_id": {"$in": list(expected)}}, {"order_position": 1}).to_list(length=None)
+        return len(current) == len(expected) and all(channel.get("order_position") == expected[channel["_id"]] for channel in current)
+
+    # Move a channel to a 1-based slot by giving it a position between its new neighbours.
+    # Optimistic without a transaction: the write is conditional on the channel's own position, and a move whose
+    # neighbours changed meanwhile (a concurrent move or rebalance) is planned and written again
+    async def move_channel(self, channel_id: str, order_position: int) -> Optional[dict]:
+        try:
+            object_id = ObjectId(channel_id)
+            for attempt in range(1, self.move_attempts + 1):
+                channel = await self.db.channels.find_one({"_id": object_id}, {"order_position": 1})
+                if not channel:
+                    raise HTTPException(status_code=404, detail="Channel not found")
+
+                lower, upper, new_position = await self.plan_move(object_id, order_position)
+                result = await self.db.channels.update_one(
+                    {"_id": object_id, "order_position": channel.get("order_position")},
+                    {"$set": {"order_position": new_position, "updated_at": get_current_iso_timestamp()}}
+                )
+                channel_documents.clear(object_id)
+                channel_catalog.mark_stale()
+
+                if result.matched_count and await self.neighbours_unchanged(lower, upper):
+                    break
+                self.logger.warning("Channel %s or its neighbours moved concurrently, retrying move (attempt %d)", channel_id, attempt)
+            else:
+                # An attempt may still have written a position, cached lists must not keep the old order
+                await self.cache.invalidate(self.cache_key, "list_active_channels")
+                raise HTTPException(status_code=409, detail="Channel order changed concurrently, please try again")
+
+            # Repeated moves into the same gap halve it each time, renumber before floats run out
+            if lower and upper and upper.get("order_position") - lower.get("order_position") < self.order_min_gap:
+                self.schedule_rebalance()
+
+            self.logger.info("Channel %s moved to position %s", channel_id, new_position)
+            return {"status": True, "message": "Channel order position updated successfully"}
+
+        except HTTPException:
+            raise
+        except bson_errors.InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid channel ID")
+        except PyMongoError as e:
+            self.logger.error("Error in %s for ID %s: %s", "move_channel", channel_id, e)
+            raise HTTPException(status_code=500, detail="Could not update channel order position")
+
+    # Apply a full new channel ordering in one bulk write, unlisted channels following in their current order
+    async def reorder_channels(self, channel_ids: list) -> dict:
+        try:
+            ordered_ids = [ObjectId(channel_id) for channel_id in channel_ids]
+            if len(set(ordered_ids)) != len(ordered_ids):
+                raise HTTPException(status_code=400, detail="Duplicate channel IDs in ordering")
+
+            channels = await (self.db.channels.find({}, {"_id": 1})
+                              .sort([("order_position", 1), ("_id", 1)])
+                              .to_list(length=None))
+            known_ids = [channel["_id"] for channel in channels]
+            missing = set(ordered_ids).difference(known_ids)
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Channels not found: {', '.join(sorted(map(str, missing)))}")
+
+            listed = set(ordered_ids)
+            full_order = ordered_ids + [channel_id for channel_id in known_ids if channel_id not in listed]
+            timestamp = get_current_iso_timestamp()
+            result = await self.db.channels.bulk_write(
+                [
+                    UpdateOne({"_id": channel_id}, {"$set": {"order_position": position, "updated_at": timestamp}})
+                    for position, channel_id in enumerate(full_order, start=1)
+                ],
+                ordered=False
+            )
+            channel_documents.clear()
+            channel_catalog.mark_stale()
+
+            self.logger.info("Channels reordered: %d listed, %d updated", len(ordered_ids), result.modified_count)
+            return {"status": True, "message": "Channels reordered successfully", "updated": result.modified_count}
+
+        except HTTPException:
+            raise
+        except bson_errors.InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid channel ID")
+        except PyMongoError as e:
+            self.logger.error("Error in %s: %s", "reorder_channels", e)
+            raise HTTPException(status_code=500, detail="Could not reorder channels")
+
+    # Renumber every channel 1..n in its current order
+    async def rebalance_channel_order(self) -> int:
+        channels = await (self.db.channels.find({}, {"order_position": 1})
+                          .sort([("order_position", 1), ("_id", 1)])
+                          .to_list(length=None))
+
+        # Each write only applies if the channel has not moved since it was read
+        timestamp = get_current_iso_timestamp()
+        updates = [
+            UpdateOne({"_id": channel["_id"], "order_position": channel.get("order_position")}, {"$set": {"order_position": position, "updated_at": timestamp}})
+            for position, channel in enumerate(channels, start=1)
+            if channel.get("order_position") != position
+        ]
+        if not updates:
+            return 0
+
+        result = await self.db.channels.bulk_write(updates, ordered=False)
+        channel_documents.clear()
+        channel_catalog.mark_stale()
+        self.logger.info("Channel order rebalanced, %d of %d channels renumbered", result.modified_count, len(channels))
+        return result.modified_count
+
+    # Run a rebalance in the background, at most one at a time per worker
+    def schedule_rebalance(self):
+        if self.rebalance_task is None or self.rebalance_task.done():
+            self.rebalance_task = asyncio.create_task(self.run_rebalance())
+
+    # Background rebalance, errors only logged
+    async def run_rebalance(self):
+        try:
+            await self.rebalance_channel_order()
+        except PyMongoError as e:
+            self.logger.error("Channel order rebalance failed: %s", e)
@@ -0,0 +1,75 @@
+# counter_service.py
+from typing import Optional
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from app.services.base_service import BaseService
+from config import config
+from db.counters import ACTIVE_USERS, CHANNEL_READY_STORIES
+
+class CounterService(BaseService):
+    """Denormalized list totals, so paginated lists need no count_documents per request.
+
+    Counters are only incremented once they exist, a missing counter meaning
+    "not backfilled yet": reads then fall back to an exact count until
+    ``python -m db.counters rebuild`` has run.
+
+    The data write and its ``$inc`` are two single-document writes, not a
+    transaction (which would require a replica set). A process dying or an
+    ``$inc`` failing in between leaves the counter off by one, logged as
+    "Could not adjust"; totals are clamped at zero and rerunning the rebuild
+    repairs the drift. Channel totals have no counter, see
+    ``ChannelService.list_active_channels``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.total_mode = config["pagination_total_mode"]
+
+    # Estimated mode skips counting, totals being derived from the page itself
+    @property
+    def estimated(self) -> bool:
+        return self.total_mode == "estimated"
+
+    # Lower bound on the total: items before the page plus those fetched with one lookahead item.
+    # None in cursor mode, where the number of items before the page is unknown
+    def estimate_total(self, skip: int, fetched: int, cursor: str = None) -> Optional[int]:
+        return None if cursor else skip + fetched
+
+    # Page count of a total, None when the total is unknown
+    def count_pages(self, total: Optional[int], page_size: int) -> Optional[int]:
+        return None if total is None else (total + page_size - 1) // page_size
+
+    # Adjust the global active-user count
+    async def adjust_active_users(self, delta: int):
+        try:
+            await self.db.counters.update_one({"_id": ACTIVE_USERS}, {"$inc": {"value": delta}})
+        except PyMongoError as e:
+            self.logger.error("Could not adjust %s by %d: %s", ACTIVE_USERS, delta, e)
+
+    # Adjust the ready-story count of a channel
+    async def adjust_channel_stories(self, channel_id: ObjectId, delta: int):
+        try:
+            await self.db.channels.update_one(
+                {"_id": channel_id, CHANNEL_READY_STORIES: {"$exists": True}},
+                {"$inc": {CHANNEL_READY_STORIES: delta}}
+            )
+        except PyMongoError as e:
+            self.logger.error("Could not adjust ready stories of channel %s by %d: %s", channel_id, delta, e)
+
+    # Number of active users
+    async def count_active_users(self) -> int:
+        if self.total_mode != "exact":
+            counter = await self.db.counters.find_one({"_id": ACTIVE_USERS}, {"value": 1})
+            if counter is not None:
+                return max(0, counter["value"])
+            self.logger.warning("Counter %s missing, counting users", ACTIVE_USERS)
+        return await self.db.users.count_documents({"is_active": True})
+
+    # Number of ready stories in a channel
+    async def count_channel_stories(self, channel_id: ObjectId) -> int:
+        if self.total_mode != "exact":
+            channel = await self.db.channels.find_one({"_id": channel_id}, {CHANNEL_READY_STORIES: 1})
+            if channel is not None and CHANNEL_READY_STORIES in channel:
+                return max(0, channel[CHANNEL_READY_STORIES])
+            self.logger.warning("Ready story count missing for channel %s, counting stories", channel_id)
+        return await self.db.audio_stories.count_documents({"channel_id": channel_id, "is_ready": True})
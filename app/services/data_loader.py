@@ -0,0 +1,113 @@
+# data_loader.py
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from bson import ObjectId
+from db import db
+
+# Lookups made during the current request, keyed by (collection, _id); None outside a request
+_request_documents: ContextVar = ContextVar("request_documents", default=None)
+
+# Give the enclosed code its own request-level document cache
+@contextmanager
+def request_scope():
+    token = _request_documents.set({})
+    try:
+        yield
+    finally:
+        _request_documents.reset(token)
+
+class DocumentLoader:
+    """DataLoader-style lookups of documents by ``_id`` in one collection.
+
+    Loads queued during the same event-loop tick, from any request, go out as
+    a single ``$in`` query. Inside a request scope each id is loaded at most
+    once; writers call ``clear`` so later reads in that request see their change.
+    """
+
+    def __init__(self, collection: str, projection: dict, database=db, max_batch_size: int = 500):
+        self.collection = collection
+        self.projection = projection
+        self.database = database
+        self.max_batch_size = max_batch_size
+        self.pending = {}
+        self.tasks = set()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # Load one document, None when it does not exist
+    async def load(self, object_id: ObjectId) -> Optional[dict]:
+        scope = _request_documents.get()
+        scope_key = (self.collection, object_id)
+
+        future = scope.get(scope_key) if scope is not None else None
+        if future is None:
+            future = self.pending.get(object_id)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                if not self.pending:
+                    loop.call_soon(self.dispatch)
+                future = self.pending[object_id] = loop.create_future()
+            if scope is not None:
+                scope[scope_key] = future
+
+        try:
+            # Shielded, so one cancelled caller does not cancel the lookup for the others
+            document = await asyncio.shield(future)
+        except Exception:
+            if scope is not None and scope.get(scope_key) is future:
+                del scope[scope_key]
+            raise
+        return dict(document) if document is not None else None
+
+    # Forget request-cached documents after a write, every one of this collection when no id is given
+    def clear(self, object_id: ObjectId = None):
+        scope = _request_documents.get()
+        if scope is None:
+            return
+        if object_id is not None:
+            scope.pop((self.collection, object_id), None)
+            return
+        for scope_key in [key for key in scope if key[0] == self.collection]:
+            del scope[scope_key]
+
+    # Send the loads queued during this tick, in chunks of max_batch_size ids
+    def dispatch(self):
+        batch, self.pending = self.pending, {}
+        object_ids = list(batch)
+        for start in range(0, len(object_ids), self.max_batch_size):
+            chunk = {object_id: batch[object_id] for object_id in object_ids[start:start + self.max_batch_size]}
+            task = asyncio.create_task(self.fetch(chunk))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    # Resolve one chunk of loads with a single $in query
+    async def fetch(self, batch: dict):
+        try:
+            cursor = self.database[self.collection].find({"_id": {"$in": list(batch)}}, self.projection)
+            documents = {document["_id"]: document async for document in cursor}
+        except Exception as e:
+            self.logger.error("Batch load of %d %s failed: %s", len(batch), self.collection, e)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(batch) > 1:
+            self.logger.debug("Loaded %d %s in one query", len(batch), self.collection)
+        for object_id, future in batch.items():
+            if not future.done():
+                future.set_result(documents.get(object_id))
+
+# Every field read through find_user_by_id and get_user_details_by_id
+user_documents = DocumentLoader("users", {
+    "firstname": 1, "lastname": 1, "email": 1, "is_active": 1,
+    "phone": 1, "role": 1, "favorite_channels": 1, "playlist": 1,
+})
+
+# Fields returned by find_channel_by_id
+channel_documents = DocumentLoader("channels", {
+    "youtube_channel_id": 1, "title": 1, "order_position": 1,
+    "thumbnail_url": 1, "description": 1, "is_active": 1,
+})
@@ -2,14 +2,24 @@
 from fastapi import HTTPException
 from pymongo.errors import PyMongoError
 from app.services.base_service import BaseService
+from common import RedisHashCache
+from config import config
+from utils.helpers import process_cache_key
 
 class PageService(BaseService):
     def __init__(self):
         super().__init__()
+        self.cache = RedisHashCache(prefix=config["cache_prefix"])
+        self.cache_key = process_cache_key()
 
     # Get page by slug
     async def get_page_by_slug(self, slug: str) -> dict | None:
         try:
+            # Slugs recently found missing skip the database
+            if await self.cache.is_missing(self.cache_key, "resource_pages", slug):
+                self.logger.warning("No active page found with slug (cached): %s", slug)
+                return None
+
             page = await self.db.resource_pages.find_one({
                 "slug": slug,
                 "is_active": True
@@ -19,10 +29,15 @@ class PageService(BaseService):
                 return page
             else:
                 self.logger.warning("No active page found with slug: %s", slug)
+                await self.cache.mark_missing(self.cache_key, "resource_pages", slug)
                 return None
         except PyMongoError as e:
             self.logger.error("Database error while fetching page with slug %s: %s", slug, str(e))
             raise HTTPException(status_code=500, detail="Internal Server Error")
         except Exception as e:
             self.logger.error("Unexpected error while fetching page with slug %s: %s", slug, str(e))
-            raise HTTPException(status_code=500, detail="Internal Server Error")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    # Clear the not-found tombstone of a slug once its page is published
+    async def clear_missing_page(self, slug: str):
+        await self.cache.clear_missing(self.cache_key, "resource_pages", slug)
@@ -1,14 +1,50 @@
 # playlist_services.py
-from pymongo.errors import PyMongoError
+import asyncio
+from fastapi.encoders import jsonable_encoder
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from fastapi import HTTPException
 from bson import ObjectId, errors as bson_errors
 from app.services.base_service import BaseService
+from app.services.channel_catalog import channel_catalog
+from app.services.data_loader import channel_documents
+from common import RedisHashCache
 from typing import Optional
-from utils.helpers import get_current_iso_timestamp
+from config import config
+from utils.helpers import get_current_iso_timestamp, process_cache_key, encode_cursor, decode_cursor, build_page_pipeline
 
 class PlaylistService(BaseService):
+    """Playlists in the ``playlists`` collection, their videos in ``playlist_items``.
+
+    Items carry an increasing ``position`` allocated from the playlist's
+    ``next_position``, and are unique per (playlist_id, video_id), so adding a
+    video twice is a no-op. Calls without a playlist ID act on the user's
+    oldest playlist.
+
+    Contents are cached per page together with the positions the page
+    covers, so adding or removing a video drops only the pages it shifts.
+    """
+
     def __init__(self):
         super().__init__()
+        self.max_playlists = config["playlist_max_per_user"]
+        self.cache = RedisHashCache(prefix=config["cache_prefix"])
+        self.cache_key = process_cache_key()
+
+    # Filter matching a user's playlist, the given one or else any of them
+    def build_playlist_filter(self, user_obj_id: ObjectId, playlist_id: str = None) -> dict:
+        query = {"user_id": user_obj_id}
+        if playlist_id:
+            query["playlist_id"] = playlist_id
+        return query
+
+    # Find a user's playlist, the oldest one when no ID is given
+    async def find_playlist(self, user_obj_id: ObjectId, playlist_id: str = None) -> Optional[dict]:
+        return await self.db.playlists.find_one(
+            self.build_playlist_filter(user_obj_id, playlist_id),
+            {"_id": 0, "playlist_id": 1, "name": 1, "created_at": 1},
+            sort=[("created_at", 1)]
+        )
 
     # Create a new playlist for a user
     async def create_playlist(self, user_id: str, playlist_data: dict) -> str:
@@ -18,23 +54,28 @@ class PlaylistService(BaseService):
             except Exception:
                 raise HTTPException(status_code=400, detail="Invalid user ID")
 
-            # Check if playlist already exists for the user
-            playlist_exists = await self.get_user_playlist(user_id)
-            if playlist_exists:
-                self.logger.error("Playlist already exists for user %s", user_id)
-                raise HTTPException(status_code=409, detail="Playlist already exists for user")
-
-            result = await self.db.users.update_one(
-                {"_id": user_obj_id},
-                {
-                    "$push": {"playlists": playlist_data},
-                    "$set": {"updated_at": get_current_iso_timestamp()}
-                }
-            )
-
-            if result.modified_count == 0:
-                self.logger.warning("Playlist not created for user %s", user_id)
-                raise HTTPException(status_code=404, detail="User not found")
+            # Bound the number of playlists per user
+            if await self.db.playlists.count_documents({"user_id": user_obj_id}, limit=self.max_playlists) >= self.max_playlists:
+                self.logger.warning("Playlist limit reached for user %s", user_id)
+                raise HTTPException(status_code=409, detail="Playlist limit reached for user")
+
+            # Initial videos keep their given order, duplicates dropped
+            videos = list(dict.fromkeys(playlist_data.get("videos", [])))
+            timestamp = get_current_iso_timestamp()
+
+            await self.db.playlists.insert_one({
+                "playlist_id": playlist_data["playlist_id"],
+                "user_id": user_obj_id,
+                "name": playlist_data.get("name", "My Playlist"),
+                "next_position": len(videos),
+                "created_at": timestamp,
+                "updated_at": timestamp
+            })
+            if videos:
+                await self.db.playlist_items.insert_many([
+                    {"playlist_id": playlist_data["playlist_id"], "video_id": video_id, "position": position, "added_at": timestamp}
+                    for position, video_id in enumerate(videos, start=1)
+                ])
 
             self.logger.info("Playlist '%s' created for user %s", playlist_data.get("name", "Playlist"), user_id)
             return playlist_data.get("playlist_id")
@@ -42,38 +83,39 @@ class PlaylistService(BaseService):
             self.logger.error("Error creating playlist for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Could not create playlist")
 
-    # Get a user's playlist ID
-    async def get_user_playlist(self, user_id: str) -> Optional[str]:
+    # List a user's playlists, oldest first
+    async def list_user_playlists(self, user_id: str) -> list:
         try:
             user_obj_id = ObjectId(user_id)
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
         try:
-            user = await self.db.users.find_one(
-                {"_id": user_obj_id},
-                {"playlists.playlist_id": 1, "_id": 0}
-            )
-
-            # Safe checks against missing keys or empty array
-            playlists = user.get("playlists") if user else None
-
-            if not playlists or not isinstance(playlists, list):
-                raise HTTPException(status_code=404, detail="Playlist not set for user")
-
-            playlist = playlists[0] if playlists else None
+            cursor = self.db.playlists.find(
+                {"user_id": user_obj_id},
+                {"_id": 0, "playlist_id": 1, "name": 1, "created_at": 1}
+            ).sort("created_at", 1)
+            return await cursor.to_list(length=self.max_playlists)
+        except PyMongoError as e:
+            self.logger.error("Error listing playlists for user %s: %s", user_id, e)
+            raise HTTPException(status_code=500, detail="Could not fetch playlists")
 
-            if not playlist or "playlist_id" not in playlist:
-                raise HTTPException(status_code=500, detail="Corrupt playlist data")
+    # Get a user's playlist ID
+    async def get_user_playlist(self, user_id: str) -> Optional[str]:
+        try:
+            user_obj_id = ObjectId(user_id)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid user ID")
 
+        try:
+            playlist = await self.find_playlist(user_obj_id)
+            if not playlist:
+                self.logger.info("Playlist not set for user %s", user_id)
+                return None
             return playlist["playlist_id"]
-
         except PyMongoError as e:
             self.logger.error(f"DB error in get_user_playlist({user_id}): {e}")
             return None
-        except HTTPException as e:
-            self.logger.error(f"HTTP error in get_user_playlist({user_id}): {e.detail}")
-            return None
 
     # Check a playlist exists for a user with given ID
     async def check_playlist_valid(self, user_id: str, playlist_id: str) -> bool:
@@ -84,15 +126,7 @@ class PlaylistService(BaseService):
                 self.logger.warning("Invalid user ID provided: %s", user_id)
                 return False
 
-            playlist = await self.db.users.find_one(
-                {
-                    "_id": user_obj_id,
-                    "playlists": {
-                        "$elemMatch": {"playlist_id": playlist_id}
-                    }
-                },
-                {"playlists.$": 1}
-            )
+            playlist = await self.db.playlists.find_one({"user_id": user_obj_id, "playlist_id": playlist_id}, {"_id": 1})
 
             if not playlist:
                 self.logger.warning("Playlist ID %s not found for user %s", playlist_id, user_id)
@@ -105,7 +139,7 @@ class PlaylistService(BaseService):
             return False
 
     # Add a single video to user's playlist
-    async def add_video_to_playlist(self, user_id: str, video_id: str) -> dict:
+    async def add_video_to_playlist(self, user_id: str, video_id: str, playlist_id: str = None) -> dict:
         try:
             # Validate user ID
             try:
@@ -119,48 +153,60 @@ class PlaylistService(BaseService):
             except Exception:
                 raise HTTPException(status_code=400, detail="Invalid video ID")
 
-            # Check if playlist exists
-            playlist_id = await self.get_user_playlist(user_id)
-            if not playlist_id:
-                raise HTTPException(status_code=404, detail="Playlist not found")
+            # Only ready stories can be added
+            if not await self.db.audio_stories.find_one({"_id": video_obj_id, "is_ready": True}, {"_id": 1}):
+                raise HTTPException(status_code=404, detail="Story not found")
 
-            # Check if video already exists in playlist
-            user = await self.db.users.find_one(
-                {
-                    "_id": user_obj_id,
-                    "playlists.playlist_id": playlist_id,
-                    "playlists.videos": video_obj_id
-                }
-            )
+            playlist = await self.find_playlist(user_obj_id, playlist_id)
+            if not playlist:
+                raise HTTPException(status_code=404, detail="Playlist not found")
 
-            if user:
+            # A video already in the playlist allocates no position
+            if await self.db.playlist_items.find_one({"playlist_id": playlist["playlist_id"], "video_id": video_obj_id}, {"_id": 1}):
                 self.logger.info("Video %s already exists in playlist for user %s", video_id, user_id)
                 return {
                     "status": True,
                     "message": "Video already in playlist",
-                    "already_exists": True
+                    "already_exists": True,
+                    "playlist_id": playlist["playlist_id"]
                 }
 
-            # Add video to playlist
-            result = await self.db.users.update_one(
-                {
-                    "_id": user_obj_id,
-                    "playlists.playlist_id": playlist_id
-                },
-                {
-                    "$push": {"playlists.$.videos": video_obj_id},
-                    "$set": {"updated_at": get_current_iso_timestamp()}
-                }
+            # Allocates the next position, missing if the playlist was removed since the lookup
+            playlist = await self.db.playlists.find_one_and_update(
+                self.build_playlist_filter(user_obj_id, playlist["playlist_id"]),
+                {"$inc": {"next_position": 1}, "$set": {"updated_at": get_current_iso_timestamp()}},
+                projection={"playlist_id": 1, "next_position": 1},
+                return_document=ReturnDocument.AFTER
             )
+            if not playlist:
+                raise HTTPException(status_code=404, detail="Playlist not found")
 
-            if result.modified_count == 0:
-                raise HTTPException(status_code=404, detail="Failed to add video to playlist")
+            # Inserted only if absent: a concurrent add of the same video keeps its position, leaving a harmless gap here
+            try:
+                result = await self.db.playlist_items.update_one(
+                    {"playlist_id": playlist["playlist_id"], "video_id": video_obj_id},
+                    {"$setOnInsert": {"position": playlist["next_position"], "added_at": get_current_iso_timestamp()}},
+                    upsert=True
+                )
+                added = result.upserted_id is not None
+            except DuplicateKeyError:
+                added = False  # A concurrent add of the same video won
+
+            if not added:
+                self.logger.info("Video %s already exists in playlist for user %s", video_id, user_id)
+                return {
+                    "status": True,
+                    "message": "Video already in playlist",
+                    "already_exists": True,
+                    "playlist_id": playlist["playlist_id"]
+                }
 
             self.logger.info("Video %s added to playlist for user %s", video_id, user_id)
             return {
                 "status": True,
                 "message": "Video added to playlist successfully",
-                "already_exists": False
+                "already_exists": False,
+                "playlist_id": playlist["playlist_id"]
             }
 
         except PyMongoError as e:
@@ -168,7 +214,7 @@ class PlaylistService(BaseService):
             raise HTTPException(status_code=500, detail="Could not add video to playlist")
 
     # Remove a single video from user's playlist
-    async def remove_video_from_playlist(self, user_id: str, video_id: str) -> dict:
+    async def remove_video_from_playlist(self, user_id: str, video_id: str, playlist_id: str = None) -> dict:
         try:
             # Validate user ID
             try:
@@ -183,29 +229,22 @@ class PlaylistService(BaseService):
                 raise HTTPException(status_code=400, detail="Invalid video ID")
 
             # Check if playlist exists
-            playlist_id = await self.get_user_playlist(user_id)
-            if not playlist_id:
+            playlist = await self.find_playlist(user_obj_id, playlist_id)
+            if not playlist:
                 raise HTTPException(status_code=404, detail="Playlist not found")
 
             # Remove video from playlist (no error if video doesn't exist)
-            result = await self.db.users.update_one(
-                {
-                    "_id": user_obj_id,
-                    "playlists.playlist_id": playlist_id
-                },
-                {
-                    "$pull": {"playlists.$.videos": video_obj_id},
-                    "$set": {"updated_at": get_current_iso_timestamp()}
-                }
+            result = await self.db.playlist_items.find_one_and_delete(
+                {"playlist_id": playlist["playlist_id"], "video_id": video_obj_id},
+                projection={"position": 1}
             )
 
-            if result.matched_count == 0:
-                raise HTTPException(status_code=404, detail="Playlist not found")
-
             self.logger.info("Video %s removed from playlist for user %s", video_id, user_id)
             return {
                 "status": True,
-                "message": "Video removed from playlist successfully"
+                "message": "Video removed from playlist successfully",
+                "playlist_id": playlist["playlist_id"],
+                "position": result.get("position") if result else None
             }
 
         except PyMongoError as e:
@@ -213,28 +252,25 @@ class PlaylistService(BaseService):
             raise HTTPException(status_code=500, detail="Could not remove video from playlist")
 
     # Remove a user's playlist
-    async def remove_playlist(self, user_id: str) -> dict:
+    async def remove_playlist(self, user_id: str, playlist_id: str = None) -> dict:
         try:
             try:
                 user_obj_id = ObjectId(user_id)
             except Exception:
                 raise HTTPException(status_code=400, detail="Invalid user ID")
 
-            playlist_id = await self.get_user_playlist(user_id)
+            playlist = await self.db.playlists.find_one_and_delete(
+                self.build_playlist_filter(user_obj_id, playlist_id),
+                projection={"playlist_id": 1},
+                sort=[("created_at", 1)]
+            )
 
-            if playlist_id is None:
+            if playlist is None:
                 raise HTTPException(status_code=404, detail="No playlist found to remove")
 
-            result = await self.db.users.update_one(
-                {"_id": user_obj_id},
-                {"$unset": {"playlists": ""},
-                 "$set": {"updated_at": get_current_iso_timestamp()}}
-            )
+            await self.db.playlist_items.delete_many({"playlist_id": playlist["playlist_id"]})
 
-            if result.modified_count == 0:
-                raise HTTPException(status_code=404, detail="Playlist not removed")
-
-            self.logger.info("Playlist removed for user %s", user_id)
+            self.logger.info("Playlist %s removed for user %s", playlist["playlist_id"], user_id)
             return {
                 "status": True,
                 "detail": "Playlist removed successfully"
@@ -244,19 +280,176 @@ class PlaylistService(BaseService):
             self.logger.error("Error removing playlist for %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Could not remove playlist")
 
-    # Get all videos in a user's playlist
-    async def get_user_playlist_details(self, user_id: str):
+    # Name and video count of a user's playlist
+    async def load_playlist_summary(self, user_id: str, playlist_id: str = None) -> Optional[dict]:
         try:
             user_obj_id = ObjectId(user_id)
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid user ID")
 
-        user = await self.db.users.find_one(
-            {"_id": user_obj_id},
-            {"playlists": 1, "_id": 0}
-        )
+        playlist = await self.find_playlist(user_obj_id, playlist_id)
+        if not playlist:
+            return None
 
-        if not user or not user.get("playlists"):
-            return []
+        return {
+            "playlist_id": playlist["playlist_id"],
+            "name": playlist.get("name", ""),
+            "total": await self.db.playlist_items.count_documents({"playlist_id": playlist["playlist_id"]})
+        }
+
+    # Cache params of one page of a playlist, page-number and cursor pages kept apart
+    def build_contents_params(self, user_id: str, playlist_id: str, page: int, page_size: int, cursor: str = None) -> dict:
+        params = {"user_id": user_id, "playlist_id": playlist_id, "page_size": page_size}
+        params.update({"cursor": cursor} if cursor else {"page": page})
+        return params
+
+    # Aggregation for one page of playlist items joined to their stories, in playlist order
+    def build_contents_pipeline(self, playlist_id: str, skip: int, limit: int, after: int = None) -> list:
+        return build_page_pipeline(
+            {"playlist_id": playlist_id},
+            {"position": 1},
+            skip,
+            limit,
+            {"_id": 1, "position": 1, "video_id": 1},
+            {"position": {"$gt": after}} if after is not None else None
+        ) + [
+            # $lookup keeps the input order, so the page stays in playlist order
+            {"$lookup": {"from": "audio_stories", "localField": "video_id", "foreignField": "_id", "as": "story"}},
+            {"$unwind": {"path": "$story", "preserveNullAndEmptyArrays": True}},
+            {"$project": {
+                "_id": 1,
+                "position": 1,
+                "video_id": 1,
+                "file_path": "$story.file_path",
+                "file_name": "$story.file_name",
+                "meta_details": "$story.meta_details",
+                "channel_id": "$story.channel_id"
+            }}
+        ]
+
+    # Channel info by channel ID, from the catalog with a batched lookup for channels it lacks
+    async def resolve_channels(self, channel_ids: set) -> dict:
+        channels = {}
+        missing = []
+        for channel_id in channel_ids:
+            channel = channel_catalog.get(channel_id)
+            if channel is not None:
+                channels[channel_id] = channel
+            else:
+                missing.append(channel_id)
+
+        # Loads issued together go out as one $in query
+        documents = await asyncio.gather(*(channel_documents.load(channel_id) for channel_id in missing))
+        channels.update((channel_id, document) for channel_id, document in zip(missing, documents) if document is not None)
+
+        return {
+            channel_id: {
+                "youtube_channel_id": channel.get("youtube_channel_id"),
+                "title": channel.get("title"),
+                "thumbnail_url": channel.get("thumbnail_url")
+            }
+            for channel_id, channel in channels.items()
+        }
+
+    # Fetch one page of a playlist with the positions it covers
+    async def fetch_contents_page(self, playlist_id: str, page: int, page_size: int, cursor: str = None) -> dict:
+        after = decode_cursor(cursor)[0] if cursor else None
+        if after is not None and not isinstance(after, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        pipeline = self.build_contents_pipeline(playlist_id, 0 if cursor else (page - 1) * page_size, page_size, after)
+        rows = await self.db.playlist_items.aggregate(pipeline).to_list(length=None)
+        channels = await self.resolve_channels({row["channel_id"] for row in rows if row.get("channel_id")})
+
+        # Videos whose story or channel is gone are left out, as the channel join used to do
+        items = [
+            {
+                "video_id": str(row["video_id"]),
+                "file_path": row.get("file_path"),
+                "file_name": row.get("file_name"),
+                "meta_details": row.get("meta_details"),
+                "channel": channels[row["channel_id"]]
+            }
+            for row in rows
+            if row.get("channel_id") in channels
+        ]
+
+        last = rows[-1] if rows else None
+        return {
+            "items": jsonable_encoder(items),
+            "after": after,
+            "last_position": last["position"] if last else None,
+            "full": len(rows) == page_size,
+            "next_cursor": encode_cursor(last["position"], last["_id"]) if last and len(rows) == page_size else None
+        }
+
+    # Get one page of videos in a user's playlist, in playlist order
+    async def get_playlist_contents(self, user_id: str, playlist_id: str = None, page: int = 1, page_size: int = 50, cursor: str = None) -> Optional[dict]:
+        try:
+            # The summary is cached until the playlist's contents change
+            summary_params = {"user_id": user_id, "playlist_id": playlist_id}
+
+            # With a known playlist ID the summary and the page are read in one round trip
+            if playlist_id:
+                summary, contents = await self.cache.h_get_many(self.cache_key, [
+                    ("user_playlist_contents", summary_params),
+                    ("user_playlist_contents", self.build_contents_params(user_id, playlist_id, page, page_size, cursor))
+                ])
+            else:
+                summary, contents = await self.cache.h_get(self.cache_key, "user_playlist_contents", summary_params), None
+
+            pending = []
+            if summary is None:
+                summary = await self.load_playlist_summary(user_id, playlist_id)
+                if not summary:
+                    return None
+                pending.append(("user_playlist_contents", summary_params, summary))
+
+            # Pages are keyed by the resolved playlist, so the default playlist shares them
+            params = self.build_contents_params(user_id, summary["playlist_id"], page, page_size, cursor)
+            if contents is None and not playlist_id:
+                contents = await self.cache.h_get(self.cache_key, "user_playlist_contents", params)
+            if contents is None:
+                contents = await self.fetch_contents_page(summary["playlist_id"], page, page_size, cursor)
+                pending.append(("user_playlist_contents", params, contents))
+
+            # Whatever was missing is written back in one round trip
+            if pending:
+                await self.cache.h_set_many(self.cache_key, pending)
 
-        return user["playlists"][0]
\ No newline at end of file
+            return {
+                "playlist_id": summary["playlist_id"],
+                "name": summary["name"],
+                "total": summary["total"],
+                "page": None if cursor else page,
+                "page_size": page_size,
+                "next_cursor": contents["next_cursor"],
+                "playlist_items": contents["items"]
+            }
+        except PyMongoError as e:
+            self.logger.error("Error fetching playlist contents for user %s: %s", user_id, e)
+            raise HTTPException(status_code=500, detail="Could not fetch playlist contents")
+
+    # Drop the cached pages a change shifts: position is the removed video's, None for an appended video
+    async def invalidate_contents(self, user_id: str, playlist_id: str, position: int = None):
+        stale = [("user_playlist_contents", {"user_id": user_id, "playlist_id": summary_id}) for summary_id in (playlist_id, None)]
+
+        entries = await self.cache.h_get_all(self.cache_key, "user_playlist_contents", user_id)
+        for field_key, contents in entries.items():
+            params = dict(part.split("=", 1) for part in field_key.split("|") if "=" in part)
+            if params.get("playlist_id") != playlist_id or "page_size" not in params:
+                continue
+
+            if position is None:
+                # An appended video only lands on a page that was not full
+                affected = not contents.get("full")
+            else:
+                # Removal shifts every later item: offset pages from the removed video on, cursor pages only when it is inside
+                last_position, after = contents.get("last_position"), contents.get("after")
+                affected = last_position is not None and position <= last_position and (after is None or position > after)
+
+            if affected:
+                stale.append(("user_playlist_contents", {"user_id": user_id, **params}))
+
+        # Summaries and affected pages are dropped in one pipeline
+        await self.cache.h_del_many(self.cache_key, stale)
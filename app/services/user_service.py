@@ -4,12 +4,18 @@ from pymongo.errors import PyMongoError
 from fastapi import HTTPException
 from bson import ObjectId, errors as bson_errors
 from app.services.base_service import BaseService
+from app.services.counter_service import CounterService
+from app.services.data_loader import user_documents
 from typing import Optional
-from utils.helpers import get_current_iso_timestamp
+from utils.helpers import get_current_iso_timestamp, encode_cursor, build_keyset_filter
+from common import token_versions, revocation_list
+from config import config
+import time
 
 class UserService(BaseService):
     def __init__(self):
         super().__init__()
+        self.counters = CounterService()
 
     # Create a new user
     async def create_user(self, user_data: dict) -> Optional[dict]:
@@ -18,6 +24,8 @@ class UserService(BaseService):
             user_data["created_at"] = timestamp
             user_data["updated_at"] = timestamp
             user = await self.db.users.insert_one(user_data)
+            if user_data.get("is_active"):
+                await self.counters.adjust_active_users(1)
 
             self.logger.info("User created successfully: %s", user_data.get("email"))
             return {
@@ -42,16 +50,13 @@ class UserService(BaseService):
     # Find a user by ID
     async def find_user_by_id(self, user_id: str) -> Optional[dict]:
         try:
-            user = await self.db.users.find_one(
-                {"_id": ObjectId(user_id)},
-                {"_id": 0, "firstname": 1, "lastname": 1, "email": 1, "is_active": 1},
-            )
+            user = await user_documents.load(ObjectId(user_id))
             if not user:
                 self.logger.warning("User not found for ID %s", user_id)
                 raise HTTPException(status_code=404, detail="User not found")
 
             self.logger.info("Fetched user profile for ID %s", user_id)
-            return user
+            return {field: user[field] for field in ("firstname", "lastname", "email", "is_active") if field in user}
         except PyMongoError as e:
             self.logger.error("Error in %s for ID %s: %s", "find_user_by_id", user_id, e)
             raise HTTPException(status_code=500, detail="Could not fetch user data")
@@ -65,46 +70,62 @@ class UserService(BaseService):
                 detail="An unexpected error occurred while fetching user data",
             )
 
-    # List of active users with pagination
-    async def list_users(self, page: int = 1, page_size: int = 10) -> dict:
+    # List of active users with page-number or cursor (created_at, _id) pagination
+    async def list_users(self, page: int = 1, page_size: int = 10, cursor: str = None) -> dict:
         try:
             skip = (page - 1) * page_size
 
             query = {"is_active": True}
             projection = {
-                "_id": 0,
+                "_id": 1,
+                "created_at": 1,
                 "firstname": 1,
                 "lastname": 1,
                 "email": 1,
                 "is_active": 1,
             }
 
-            # Count total matching users
-            total_users = await self.db.users.count_documents(query)
+            # Total from the maintained active-user counter, estimated mode skips counting
+            estimated = self.counters.estimated
+            total_users = None if estimated else await self.counters.count_active_users()
 
-            # Fetch paginated users
-            cursor = (
-                self.db.users.find(query, projection)
-                .sort("created_at", -1)  # Sort by created_at DESC
-                .skip(skip)
-                .limit(page_size)
+            # Fetch paginated users, cursor mode seeks past the last item instead of skipping
+            page_query = {**query, **build_keyset_filter("created_at", cursor, descending=True)} if cursor else query
+            limit = page_size + 1 if estimated else page_size
+            find_cursor = (
+                self.db.users.find(page_query, projection)
+                .sort([("created_at", -1), ("_id", -1)])  # Sort by created_at DESC
+                .skip(0 if cursor else skip)
+                .limit(limit)
             )
 
-            result = await cursor.to_list(length=page_size)
+            result = await find_cursor.to_list(length=limit)
+            if estimated:
+                total_users = self.counters.estimate_total(skip, len(result), cursor)
+                result = result[:page_size]
 
             self.logger.info(
-                "Fetched %d active users (page %d, page_size %d)",
-                len(result), page, page_size
+                "Fetched %d active users (page %s, page_size %d)",
+                len(result), "cursor" if cursor else page, page_size
             )
 
+            last = result[-1] if len(result) == page_size else None
+            next_cursor = encode_cursor(last.get("created_at"), last["_id"]) if last else None
+            for user in result:
+                user.pop("_id", None)
+                user.pop("created_at", None)
+
             return {
                 "total": total_users,
-                "page": page,
+                "page": None if cursor else page,
                 "page_size": page_size,
-                "total_pages": (total_users + page_size - 1) // page_size,
+                "total_pages": self.counters.count_pages(total_users, page_size),
+                "next_cursor": next_cursor,
                 "data": result
             }
 
+        except HTTPException:
+            raise
         except PyMongoError as e:
             self.logger.error("Error in list_users: %s", e)
             raise HTTPException(status_code=500, detail="Could not fetch users data")
@@ -147,19 +168,34 @@ class UserService(BaseService):
                 detail="An unexpected error occurred while fetching user data",
             )
 
+    # Replace a user password hash after a work factor change, unless the password changed meanwhile
+    async def update_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> bool:
+        try:
+            result = await self.db.users.update_one(
+                {"_id": ObjectId(user_id), "password_hash": old_hash},
+                {"$set": {"password_hash": new_hash, "updated_at": get_current_iso_timestamp()}}
+            )
+            if result.modified_count:
+                self.logger.info("Password hash upgraded for user ID %s", user_id)
+            return bool(result.modified_count)
+        except (PyMongoError, bson_errors.InvalidId) as e:
+            self.logger.error("Error in %s for ID %s: %s", "update_password_hash", user_id, e)
+            return False
+
     # Get user profile by ID
     async def get_user_details_by_id(self, user_id: str) -> Optional[dict]:
         try:
-            user = await self.db.users.find_one(
-                {"_id": ObjectId(user_id), "is_active": True},
-                {"_id": 0, "firstname": 1, "lastname": 1, "email": 1, "phone": 1, "role": 1, "favorite_channels": 1, "playlist": 1},
-            )
-            if not user:
+            user = await user_documents.load(ObjectId(user_id))
+            if not user or user.get("is_active") is not True:
                 self.logger.warning("User not found for ID %s", user_id)
                 raise HTTPException(status_code=404, detail="User not found")
 
             self.logger.info("Fetched user profile for ID %s", user_id)
-            return user
+            return {
+                field: user[field]
+                for field in ("firstname", "lastname", "email", "phone", "role", "favorite_channels", "playlist")
+                if field in user
+            }
         except PyMongoError as e:
             self.logger.error("Error in %s for ID %s: %s", "get_user_by_id", user_id, e)
             raise HTTPException(status_code=500, detail="Could not fetch user data")
@@ -180,6 +216,7 @@ class UserService(BaseService):
             result = await self.db.users.update_one(
                 {"_id": ObjectId(user_id)}, {"$set": update_data}
             )
+            user_documents.clear(ObjectId(user_id))
 
             if result.modified_count == 0:
                 self.logger.warning(
@@ -205,6 +242,31 @@ class UserService(BaseService):
                 detail="An unexpected error occurred while updating user data",
             )
 
+    # Activate or deactivate a user, keeping the active-user count in step
+    async def set_user_status(self, user_id: str, is_active: bool) -> Optional[dict]:
+        try:
+            # Only an actual transition matches, so concurrent toggles adjust the count once
+            result = await self.db.users.update_one(
+                {"_id": ObjectId(user_id), "is_active": {"$ne": is_active}},
+                {"$set": {"is_active": is_active, "updated_at": get_current_iso_timestamp()}}
+            )
+            user_documents.clear(ObjectId(user_id))
+            if result.modified_count == 0:
+                self.logger.warning("User status unchanged for ID %s", user_id)
+                raise HTTPException(status_code=404, detail="User not found or no changes made")
+
+            await self.counters.adjust_active_users(1 if is_active else -1)
+            self.logger.info("User %s %s", user_id, "activated" if is_active else "deactivated")
+            return {"status": True, "message": "User status updated successfully"}
+        except HTTPException:
+            raise
+        except bson_errors.InvalidId:
+            self.logger.warning("Invalid user ID for status update: %s", user_id)
+            raise HTTPException(status_code=400, detail="Invalid user ID")
+        except PyMongoError as e:
+            self.logger.error("Error in %s for ID %s: %s", "set_user_status", user_id, e)
+            raise HTTPException(status_code=500, detail="Could not update user status")
+
     # Find user by verification token
     async def find_by_verification_token(self, token: str) -> Optional[dict]:
         try:
@@ -253,6 +315,7 @@ class UserService(BaseService):
                         "$set": {"updated_at": get_current_iso_timestamp()}
                     }
                 )
+            user_documents.clear(ObjectId(user_id))
 
             if result.modified_count == 0:
                 self.logger.warning("No changes made for channel ID %s", channel_id)
@@ -267,14 +330,42 @@ class UserService(BaseService):
             self.logger.error("Error in %s for ID %s: %s", "update_favourite_status", channel_id, e)
             raise HTTPException(status_code=500, detail=f"Could not update favourite status: {e}")
 
+    # Check whether a channel is in the user's favourites without loading the user
+    async def has_favourite_channel(self, user_id: str, channel_id: str) -> bool:
+        try:
+            user = await self.db.users.find_one(
+                {"_id": ObjectId(user_id), "favorite_channels": ObjectId(channel_id)},
+                {"_id": 1}
+            )
+            return user is not None
+        except bson_errors.InvalidId:
+            self.logger.warning("Invalid ID for favourite check: user %s, channel %s", user_id, channel_id)
+            raise HTTPException(status_code=400, detail="Invalid channel ID")
+        except PyMongoError as e:
+            self.logger.error("Error in %s for ID %s: %s", "has_favourite_channel", user_id, e)
+            raise HTTPException(status_code=500, detail="Could not fetch user data")
+
     # User sign-out functionality to invalidate tokens
-    async def logout_user(self, user_id: str) -> dict:
+    async def logout_user(self, user_id: str, token_payload: dict, everywhere: bool = False) -> dict:
         try:
-            # Here you would typically add logic to invalidate the user's tokens
-            # For example, adding the token to a blacklist or updating a token version in the database
+            # Revoke this session: the access token and the refresh token it was issued with
+            revoked = await revocation_list.revoke(token_payload.get("jti"), token_payload.get("exp", 0))
+            if token_payload.get("rti"):
+                # Tokens issued before "rexp" was added fall back to the longest refresh lifetime
+                refresh_expires_at = token_payload.get("rexp") or time.time() + max(30, config["refresh_token_expire_days"]) * 86400
+                revoked = await revocation_list.revoke(token_payload["rti"], refresh_expires_at) and revoked
+
+            # Bumping the token version invalidates every token issued to the user so far
+            if everywhere:
+                revoked = await token_versions.bump("user", user_id) and revoked
+
+            if not revoked:
+                raise HTTPException(status_code=503, detail="Could not sign out right now, please try again")
 
             self.logger.info("User %s logged out successfully", user_id)
             return {"status": True, "message": "User logged out successfully"}
+        except HTTPException:
+            raise
         except Exception as e:
             self.logger.error("Error logging out user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Could not log out user")
\ No newline at end of file
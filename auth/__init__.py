@@ -1,4 +1,5 @@
-from auth.jwt_auth import JWTAuth
+from auth.jwt_auth import JWTAuth, get_jwt_auth
+from auth.token_cache import VerifiedTokenCache, verified_tokens
 from auth.dependencies import JWTAuthGuard
 
-__all__ = ['JWTAuth', 'JWTAuthGuard']
\ No newline at end of file
+__all__ = ['JWTAuth', 'get_jwt_auth', 'JWTAuthGuard', 'VerifiedTokenCache', 'verified_tokens']
\ No newline at end of file
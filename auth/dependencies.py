@@ -1,19 +1,21 @@
 from fastapi import Header, HTTPException
-from auth.jwt_auth import JWTAuth
+from auth.jwt_auth import get_jwt_auth
+from common.token_versions import token_versions
+from common.token_revocation import revocation_list
 
 class JWTAuthGuard:
     def __init__(self, expected_role: str):
         self.expected_role = expected_role
+        self.jwt_auth = get_jwt_auth()
 
     async def __call__(self, authorization: str = Header(...)):
         if not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Invalid token format")
 
         token = authorization.split(" ")[1]
-        jwt = JWTAuth()
 
         try:
-            payload = await jwt.verify_token(token)  # assuming this is async
+            payload = await self.jwt_auth.verify_token(token)
         except Exception:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -24,4 +26,14 @@ class JWTAuthGuard:
         if role != self.expected_role:
             raise HTTPException(status_code=403, detail=f"{self.expected_role.capitalize()}s only")
 
+        # Reject tokens issued before a deactivation, and tokens revoked at sign-out
+        try:
+            is_current = await token_versions.is_current(payload)
+            is_revoked = await revocation_list.is_revoked(payload.get("jti"))
+        except Exception:
+            raise HTTPException(status_code=503, detail="Could not verify session")
+
+        if not is_current or is_revoked:
+            raise HTTPException(status_code=401, detail="Session expired, please sign in again")
+
         return payload
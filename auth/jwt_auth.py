@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from typing import Optional
+from functools import lru_cache
+import uuid
 from config import config
+from auth.token_cache import verified_tokens
 
 class JWTAuth:
     def __init__(self):
@@ -9,12 +12,14 @@ class JWTAuth:
         self.algorithm = config["algorithm"]
         self.token_expiry = config["token_expiry"]
         self.refresh_token_expire_days = config["refresh_token_expire_days"]
+        self.verified_tokens = verified_tokens
 
     # Create an access token with the given data and optional expiry.
     async def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
         expire = datetime.utcnow() + (expires_delta or timedelta(minutes=self.token_expiry))
         to_encode.update({"exp": expire, "type": "access"})
+        to_encode.setdefault("jti", uuid.uuid4().hex)
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
 
     # Create a refresh token with the given data and optional expiry based on remember me token.
@@ -26,16 +31,23 @@ class JWTAuth:
 
         expire = datetime.utcnow() + expires_delta
         to_encode.update({"exp": expire, "type": "refresh"})
+        to_encode.setdefault("jti", uuid.uuid4().hex)
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
 
-    # Verify the given token and return its payload if valid.
+    # Verify the given token and return its payload if valid, reusing earlier verifications.
     async def verify_token(self, token: str) -> Optional[dict]:
+        payload = self.verified_tokens.get(token)
+        if payload is not None:
+            return dict(payload)
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
         except JWTError:
             return None
 
+        self.verified_tokens.set(token, payload)
+        return dict(payload)
+
     # Decode and verify a refresh token specifically.
     async def decode_refresh_token(self, token: str) -> Optional[dict]:
         try:
@@ -45,3 +57,8 @@ class JWTAuth:
             return payload
         except JWTError:
             return None
+
+# Shared verifier, so per-request auth does not rebuild it
+@lru_cache(maxsize=None)
+def get_jwt_auth() -> JWTAuth:
+    return JWTAuth()
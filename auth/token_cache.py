@@ -0,0 +1,56 @@
+import hashlib
+import time
+from collections import OrderedDict
+from config import config
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified token payloads, keyed by a digest of the token.
+
+    Entries are dropped once the token's ``exp`` has passed, so a cached
+    payload is never served for a token ``jwt.decode`` would reject as expired.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries if max_entries is not None else config["auth_token_cache_size"]
+        self.entries = OrderedDict()
+
+    # Digest used as the cache key, so raw tokens are not kept in memory
+    def build_key(self, token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    # Get the payload of a previously verified, still unexpired token
+    def get(self, token: str) -> dict | None:
+        key = self.build_key(token)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return payload
+
+    # Remember a verified payload until its token expires
+    def set(self, token: str, payload: dict):
+        if self.max_entries <= 0 or "exp" not in payload:
+            return
+
+        key = self.build_key(token)
+        self.entries[key] = (payload, float(payload["exp"]))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # Forget a token, e.g. once it has been revoked
+    def discard(self, token: str):
+        self.entries.pop(self.build_key(token), None)
+
+    # Drop every cached payload
+    def clear(self):
+        self.entries.clear()
+
+# Shared by every JWTAuth in the process
+verified_tokens = VerifiedTokenCache()
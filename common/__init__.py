@@ -1,6 +1,10 @@
 # common/__init__.py
-from .password_utils import PasswordHasher
+from .password_utils import PasswordHasher, hasher_stats
 from .cache import RedisHashCache
+from .cache_metrics import cache_metrics
+from .token_versions import TokenVersionStore, token_versions
+from .token_revocation import RevocationList, revocation_list
 from .access_tokens import AccessTokenManager
+from .rate_limiter import RateLimiter, rate_limiter
 
-__all__ = ['PasswordHasher', 'RedisHashCache', 'AccessTokenManager']
\ No newline at end of file
+__all__ = ['PasswordHasher', 'RedisHashCache', 'AccessTokenManager', 'cache_metrics', 'hasher_stats', 'TokenVersionStore', 'token_versions', 'RevocationList', 'revocation_list', 'RateLimiter', 'rate_limiter']
\ No newline at end of file
@@ -1,31 +1,38 @@
 # access_tokens.py
 from pydantic import EmailStr
-from auth.jwt_auth import JWTAuth
+from auth.jwt_auth import get_jwt_auth
+from common.token_versions import token_versions
+from common.token_revocation import revocation_list
 import base64
+import time
+import uuid
 from datetime import timedelta
 
 class AccessTokenManager:
     def __init__(self):
-        self.jwt_auth = JWTAuth()
+        self.jwt_auth = get_jwt_auth()
 
     # Create a new access token for the given user ID and role.
-    async def __create_access_token(self, user_id: str, user_email: EmailStr, role: str) -> str:
+    # The access token names its refresh token ("rti") and its expiry ("rexp") so sign-out can revoke both.
+    async def __create_access_token(self, user_id: str, user_email: EmailStr, role: str, token_version: int, refresh_token_id: str, refresh_expires_at: int) -> str:
         return await self.jwt_auth.create_access_token({
             "id": user_id,
             "sub": user_email,
-            "role": role
+            "role": role,
+            "token_version": token_version,
+            "rti": refresh_token_id,
+            "rexp": refresh_expires_at
         })
 
     # Create a new refresh token for the given user ID and role.
-    async def __create_refresh_token(self, user_id: str, user_email: EmailStr, role: str, remember_token: bool) -> str:
-        # Long expiry for remember me -> 30 days
-        expires = timedelta(days=30) if remember_token else None
-
+    async def __create_refresh_token(self, user_id: str, user_email: EmailStr, role: str, token_version: int, refresh_token_id: str, expires: timedelta) -> str:
         return await self.jwt_auth.create_refresh_token(
             {
                 "id": user_id,
                 "sub": user_email,
-                "role": role
+                "role": role,
+                "token_version": token_version,
+                "jti": refresh_token_id
             },
             expires_delta=expires
         )
@@ -35,8 +42,18 @@ class AccessTokenManager:
         if role not in ("admin", "user"):
             raise Exception("Invalid role specified. Must be 'admin' or 'user'.")
 
-        access_token = await self.__create_access_token(user_id, user_email, role)
-        refresh_token = await self.__create_refresh_token(user_id, user_email, role, remember_token)
+        # Tokens carry the session version so sign-out and deactivation can revoke them
+        token_version = await token_versions.current(role, user_id)
+
+        refresh_token_id = uuid.uuid4().hex
+
+        # Long expiry for remember me -> 30 days
+        refresh_expires = timedelta(days=30 if remember_token else self.jwt_auth.refresh_token_expire_days)
+
+        refresh_token = await self.__create_refresh_token(user_id, user_email, role, token_version, refresh_token_id, refresh_expires)
+        # Taken after the refresh token is signed, so it is never earlier than its exp claim
+        refresh_expires_at = int(time.time() + refresh_expires.total_seconds()) + 1
+        access_token = await self.__create_access_token(user_id, user_email, role, token_version, refresh_token_id, refresh_expires_at)
         encoded_refresh_token = base64.b64encode(refresh_token.encode('ascii'))
 
         return {
@@ -53,10 +70,17 @@ class AccessTokenManager:
         if not payload:
             raise Exception("Invalid or expired refresh token")
 
+        # Refresh tokens revoked at sign-out or issued before a deactivation are rejected
+        if not await token_versions.is_current(payload) or await revocation_list.is_revoked(payload.get("jti")):
+            raise Exception("Invalid or expired refresh token")
+
         new_access_token = await self.__create_access_token(
             user_id=payload.get("id"),
             user_email=payload.get("sub"),
-            role=payload.get("role", "admin")
+            role=payload.get("role", "admin"),
+            token_version=payload.get("token_version", 0),
+            refresh_token_id=payload.get("jti"),
+            refresh_expires_at=payload.get("exp")
         )
 
         return {
@@ -1,17 +1,220 @@
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError, ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from pydantic import TypeAdapter
+from functools import lru_cache
+import asyncio
+import gzip
+import hashlib
 import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
 from config import config
+from common.cache_codec import CacheCodec
+from common.cache_metrics import cache_metrics
+from common.circuit_breaker import CircuitBreaker
+
+# Per-namespace cache settings. "ttl" is the lifetime of each entry, checked on read,
+# "tag" names the param that shards the namespace (one Redis hash per tag value),
+# "local" keeps decoded values in the in-process L1 layer when it is enabled,
+# "soft_ttl" enables stale-while-revalidate: entries older than it are served stale
+# while one background task refreshes them, until the hard "ttl" drops them,
+# "response" stores the final rendered JSON body (see get_or_set_response).
+CACHE_NAMESPACES = {
+    "list_admins": {"ttl": 7200},
+    "list_users": {"ttl": 600},
+    "list_active_channels": {"ttl": 9000, "soft_ttl": 7200, "local": True, "response": True},
+    "channel_story": {"ttl": 9000, "soft_ttl": 7200, "tag": "channel_id", "local": True, "response": True},
+    "user_profile": {"ttl": 1800, "tag": "user_id"},
+    "user_playlist_contents": {"ttl": 1800, "tag": "user_id"},
+    "resource_pages": {"ttl": 90000, "soft_ttl": 86400, "tag": "slug", "local": True, "response": True},
+}
+
+# Identifies this worker process on the invalidation channel
+_process_id = uuid.uuid4().hex
+
+# L1 layers and their pub/sub listeners, shared by every RedisHashCache with the same prefix
+_local_layers = {}
+_listener_tasks = {}
+
+# In-flight cache fills per process, keyed by (prefix, cache_key, namespace, tag, field)
+_inflight = {}
+
+# Errors that mean Redis is unreachable or too slow, and count towards the breaker
+_REDIS_OUTAGE_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+
+# Trips when Redis keeps failing so cache calls become misses without waiting on timeouts
+redis_breaker = CircuitBreaker(
+    failure_threshold=config["cache_breaker_failure_threshold"],
+    reset_timeout=config["cache_breaker_reset_timeout"]
+)
+
+# Entries are stored as "<generation>:<hard expiry>:<payload>". An entry written under an
+# older namespace generation or past its own expiry is dropped when read, so writes never
+# extend the life of other entries. Every key a script touches is passed in KEYS, and the
+# namespace keys share a hash tag, so the scripts also run on Redis Cluster.
+# KEYS[1] = generation key, KEYS[2] = data hash of the namespace (tag).
+_LIVE_PAYLOAD_LUA = """
+local function live_payload(value, gen, now)
+    local gen_end = string.find(value, ':', 1, true)
+    local expiry_end = gen_end and string.find(value, ':', gen_end + 1, true)
+    if not expiry_end or string.sub(value, 1, gen_end - 1) ~= gen then
+        return nil
+    end
+    local expiry = tonumber(string.sub(value, gen_end + 1, expiry_end - 1))
+    if not expiry or expiry <= now then
+        return nil
+    end
+    return string.sub(value, expiry_end + 1)
+end
+"""
+
+# ARGV[1] = field, ARGV[2] = current time
+_GET_SCRIPT = _LIVE_PAYLOAD_LUA + """
+local value = redis.call('HGET', KEYS[2], ARGV[1])
+if not value then
+    return false
+end
+local payload = live_payload(value, redis.call('GET', KEYS[1]) or '0', tonumber(ARGV[2]))
+if not payload then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    return false
+end
+return payload
+"""
+
+# ARGV[1] = field, ARGV[2] = payload, ARGV[3] = entry expiry, ARGV[4] = entry TTL in seconds.
+# The hash only outlives its newest entry, its expiry is never shortened.
+_SET_SCRIPT = """
+local gen = redis.call('GET', KEYS[1]) or '0'
+redis.call('HSET', KEYS[2], ARGV[1], gen .. ':' .. ARGV[3] .. ':' .. ARGV[2])
+if redis.call('TTL', KEYS[2]) < tonumber(ARGV[4]) then
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+end
+return 1
+"""
+
+# ARGV[1] = current time
+_GET_ALL_SCRIPT = _LIVE_PAYLOAD_LUA + """
+local gen = redis.call('GET', KEYS[1]) or '0'
+local now = tonumber(ARGV[1])
+local data = redis.call('HGETALL', KEYS[2])
+local result = {}
+for i = 1, #data, 2 do
+    local payload = live_payload(data[i + 1], gen, now)
+    if payload then
+        result[#result + 1] = data[i]
+        result[#result + 1] = payload
+    end
+end
+return result
+"""
+
+# Release a fill lock only if it is still owned by the caller
+_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# One Redis client (and connection pool) per worker process
+@lru_cache(maxsize=None)
+def get_redis_client() -> redis.Redis:
+    return redis.Redis(
+        host=config["redis_host"],
+        port=config["redis_port"],
+        db=config["redis_db"],
+        max_connections=config["redis_max_connections"],
+        socket_timeout=config["redis_socket_timeout"],
+        socket_connect_timeout=config["redis_socket_connect_timeout"],
+        health_check_interval=30
+    )
+
+# Build (once per model) the adapter used to render cached response bodies
+@lru_cache(maxsize=None)
+def get_type_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+class LocalLRUCache:
+    """Bounded, TTL-aware LRU holding decoded cache values for one worker process."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    # Get a live entry and mark it as recently used
+    def get(self, key: tuple):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    # Store an entry, evicting the least recently used one when full
+    def set(self, key: tuple, value: any, ttl: int = None):
+        ttl = min(ttl or self.ttl, self.ttl)
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            evicted_key, _ = self.entries.popitem(last=False)
+            cache_metrics.record_eviction(evicted_key[1])
+
+    # Evict entries of a namespace, optionally narrowed to a tag and a field
+    def evict(self, cache_key: str, namespace: str, tag: str = None, field: str = None):
+        if field is not None:
+            self.entries.pop((cache_key, namespace, tag, field), None)
+            return
+
+        stale = [
+            key for key in self.entries
+            if key[0] == cache_key and key[1] == namespace and (tag is None or key[2] == tag)
+        ]
+        for key in stale:
+            del self.entries[key]
+
+    # Drop everything (used after the invalidation channel reconnects)
+    def clear(self):
+        self.entries.clear()
 
 class RedisHashCache:
     def __init__(self, prefix=None):
-        self.redis_client = redis.Redis(
-            host=config["redis_host"],
-            port=config["redis_port"],
-            db=config["redis_db"],
-            decode_responses=True
-        )
+        self.redis_client = get_redis_client()
+        self.breaker = redis_breaker
+        self.logger = logging.getLogger(self.__class__.__name__)
         self.prefix = prefix or ""
         self.ttl = 7200  # Default TTL of 120 minutes
+        self.lock_ttl = 5  # Max seconds a cross-worker fill lock is held
+        self.lock_poll_interval = 0.05  # Seconds between waiter polls for a filled value
+        self.xfetch_beta = 1.0  # Eagerness of probabilistic early refresh (higher refreshes earlier)
+        self.codec = CacheCodec()
+        self.response_gzip = config["cache_response_gzip"]
+        self.negative_ttl = config["cache_negative_ttl"]  # Seconds a not-found tombstone lives
+
+        self._get_script = self.redis_client.register_script(_GET_SCRIPT)
+        self._set_script = self.redis_client.register_script(_SET_SCRIPT)
+        self._get_all_script = self.redis_client.register_script(_GET_ALL_SCRIPT)
+        self._unlock_script = self.redis_client.register_script(_UNLOCK_SCRIPT)
+
+        # Optional in-process L1 layer, invalidated across workers over pub/sub
+        self.local = None
+        self.invalidation_channel = f"{self.build_cache_key('cache')}|invalidate"
+        if config["cache_l1_enabled"]:
+            self.local = _local_layers.setdefault(
+                self.prefix,
+                LocalLRUCache(config["cache_l1_max_entries"], config["cache_l1_ttl"])
+            )
 
     # Generate slug from params
     def generate_slug(self, params: dict) -> str:
@@ -31,69 +234,628 @@ class RedisHashCache:
         slug = self.generate_slug(params)
         return f"{field}|{slug}" if slug else field
 
-    # Set a specific field in the hash
-    async def h_set(self, cache_key: str, field: str, value: any, params: dict = None):
+    # Get TTL configured for a namespace
+    def namespace_ttl(self, namespace: str) -> int:
+        return CACHE_NAMESPACES.get(namespace, {}).get("ttl", self.ttl)
+
+    # Split params into the namespace tag and the remaining hash field
+    def split_params(self, namespace: str, params: dict = None) -> tuple:
+        """Return (tag, field) for the given namespace and params."""
+        params = dict(params or {})
+        tag_param = CACHE_NAMESPACES.get(namespace, {}).get("tag")
+        tag = params.pop(tag_param, None) if tag_param else None
+        field = self.generate_slug(params) or "_"
+        return (str(tag) if tag is not None else None), field
+
+    # Build the hash-tagged base key of a namespace, keeping all of its keys in one cluster slot
+    def build_namespace_base(self, cache_key: str, namespace: str) -> str:
+        return "{" + f"{self.build_cache_key(cache_key)}|{namespace}" + "}"
+
+    # Build the generation key and the data hash key of a namespace (and tag)
+    def build_namespace_keys(self, cache_key: str, namespace: str, tag: str = None) -> list:
+        base_key = self.build_namespace_base(cache_key, namespace)
+        return [f"{base_key}|gen", f"{base_key}{self.build_tag_suffix(tag)}"]
+
+    # Suffix appended to the namespace key for a tag
+    def build_tag_suffix(self, tag: str = None) -> str:
+        return f":{tag}" if tag is not None else ""
+
+    # Get the soft TTL of a stale-while-revalidate namespace
+    def namespace_soft_ttl(self, namespace: str):
+        return CACHE_NAMESPACES.get(namespace, {}).get("soft_ttl")
+
+    # Build the cache entry (value, soft expiry, fill duration) stored for a value
+    def build_entry(self, namespace: str, value: any, delta: float = 0.0) -> tuple:
+        soft_ttl = self.namespace_soft_ttl(namespace)
+        soft_expiry = time.time() + soft_ttl if soft_ttl else None
+        return value, soft_expiry, delta
+
+    # Check whether a namespace caches rendered response bodies
+    def is_response_namespace(self, namespace: str) -> bool:
+        return CACHE_NAMESPACES.get(namespace, {}).get("response", False)
+
+    # Serialize an entry; stale-while-revalidate namespaces keep their metadata alongside the value
+    def encode_entry(self, namespace: str, entry: tuple) -> bytes:
+        value, soft_expiry, delta = entry
+        if self.is_response_namespace(namespace):
+            body, gzipped = value
+            return self.codec.encode_body(body, gzipped, soft_expiry, delta)
+        if self.namespace_soft_ttl(namespace):
+            return self.codec.encode({"v": value, "s": soft_expiry, "d": delta})
+        return self.codec.encode(value)
+
+    # Deserialize an entry written by encode_entry
+    def decode_entry(self, namespace: str, data: bytes) -> tuple:
+        if self.is_response_namespace(namespace):
+            decoded = self.codec.decode_body(data)
+            if decoded is None:
+                return None
+
+            body, gzipped, soft_expiry, delta = decoded
+            return (body, gzipped), soft_expiry, delta
+
+        payload = self.codec.decode(data)
+        if self.namespace_soft_ttl(namespace):
+            return payload["v"], payload["s"], payload["d"]
+        return payload, None, 0.0
+
+    # Decide whether an entry should be refreshed now (XFetch probabilistic early expiration)
+    def should_refresh(self, soft_expiry: float, delta: float) -> bool:
+        """Refresh more eagerly as the soft expiry nears and for slower loaders.
+
+        Spreads refreshes of hot keys over time instead of having them all
+        expire at the same instant.
+        """
+        jitter = -delta * self.xfetch_beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= soft_expiry
+
+    # Check whether Redis may be called; while the breaker is open cache calls are misses
+    def redis_available(self) -> bool:
+        return self.breaker.allow_request()
+
+    # Treat a failed cache call as a miss: count it, log it and feed the breaker
+    def handle_error(self, operation: str, namespace: str, error: Exception):
+        cache_metrics.record_error(namespace)
+        if isinstance(error, _REDIS_OUTAGE_ERRORS):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.logger.warning("[%s] Cache error for %s: %s", operation, namespace, error)
+
+    # Check whether a namespace is served from the L1 layer
+    def uses_local(self, namespace: str) -> bool:
+        return self.local is not None and CACHE_NAMESPACES.get(namespace, {}).get("local", False)
+
+    # Start the per-process invalidation listener once an event loop is running
+    def ensure_listener(self):
+        task = _listener_tasks.get(self.prefix)
+        if task is None or task.done():
+            _listener_tasks[self.prefix] = asyncio.create_task(self.listen_invalidations())
+
+    # Apply invalidations published by other workers to the local L1 layer
+    async def listen_invalidations(self):
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+
+                # Messages may have been missed while disconnected
+                self.local.clear()
+
+                while True:
+                    # Explicit timeout: an idle channel must not trip the client socket timeout
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message.get("type") != "message":
+                        continue
+
+                    event = json.loads(message["data"])
+                    if event.get("origin") == _process_id:
+                        continue
+
+                    self.local.evict(event["cache_key"], event["namespace"], event.get("tag"), event.get("field"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    # Build the message other workers receive for an invalidation
+    def build_invalidation_event(self, cache_key: str, namespace: str, tag: str = None, field: str = None) -> str:
+        return json.dumps({
+            "origin": _process_id,
+            "cache_key": cache_key,
+            "namespace": namespace,
+            "tag": tag,
+            "field": field
+        })
+
+    # Evict this worker's L1 copies, whether or not Redis is reachable
+    def evict_local(self, cache_key: str, namespace: str, tag: str = None, field: str = None):
+        if self.uses_local(namespace):
+            self.local.evict(cache_key, namespace, tag, field)
+
+    # Evict locally and tell other workers to evict their copies
+    async def publish_invalidation(self, cache_key: str, namespace: str, tag: str = None, field: str = None):
+        if not self.uses_local(namespace):
+            return
+
+        self.local.evict(cache_key, namespace, tag, field)
+        await self.redis_client.publish(
+            self.invalidation_channel,
+            self.build_invalidation_event(cache_key, namespace, tag, field)
+        )
+
+    # Run queued commands in one pipeline, reloading the Lua scripts once if Redis lost them
+    async def execute_pipeline(self, commands: list, transaction: bool = False) -> list:
+        for attempt in range(2):
+            async with self.redis_client.pipeline(transaction=transaction) as pipe:
+                for command in commands:
+                    pipe.execute_command(*command)
+                try:
+                    return await pipe.execute()
+                except NoScriptError:
+                    if attempt:
+                        raise
+                    for script in (self._get_script, self._set_script):
+                        await self.redis_client.script_load(script.script)
+
+    # Queue an EVALSHA of one of the namespace scripts
+    def script_command(self, script, cache_key: str, namespace: str, tag: str, args: list) -> tuple:
+        keys = self.build_namespace_keys(cache_key, namespace, tag)
+        return ("EVALSHA", script.sha, len(keys), *keys, *args)
+
+    # Arguments of the set script for one entry
+    def build_set_args(self, namespace: str, field_key: str, payload: bytes) -> list:
+        ttl = self.namespace_ttl(namespace)
+        return [field_key, payload, repr(time.time() + ttl), ttl]
+
+    # Set a specific field in the namespace
+    async def h_set(self, cache_key: str, field: str, value: any, params: dict = None, delta: float = 0.0):
+        if not self.redis_available():
+            return
+
         try:
-            cache_key = self.build_cache_key(cache_key)
-            field_key = self.build_field_key(field, params)
+            tag, field_key = self.split_params(field, params)
+            entry = self.build_entry(field, value, delta)
+            payload = self.encode_entry(field, entry)
+
+            started = time.perf_counter()
+            await self._set_script(
+                keys=self.build_namespace_keys(cache_key, field, tag),
+                args=self.build_set_args(field, field_key, payload)
+            )
+            cache_metrics.observe_latency(field, "set", time.perf_counter() - started)
+            cache_metrics.observe_size(field, len(payload))
+            self.breaker.record_success()
+
+            if self.uses_local(field):
+                await self.publish_invalidation(cache_key, field, tag, field_key)
+                self.local.set((cache_key, field, tag, field_key), entry, self.namespace_ttl(field))
+        except Exception as e:
+            self.handle_error("h_set", field, e)
+
+    # Set many fields in one atomic round trip; items are (namespace, params, value) tuples
+    async def h_set_many(self, cache_key: str, items: list):
+        if not self.redis_available():
+            return
+
+        try:
+            commands = []
+            local_entries = []
+            for field, params, value in items:
+                tag, field_key = self.split_params(field, params)
+                entry = self.build_entry(field, value)
+                payload = self.encode_entry(field, entry)
+                cache_metrics.observe_size(field, len(payload))
+                commands.append(self.script_command(
+                    self._set_script, cache_key, field, tag, self.build_set_args(field, field_key, payload)
+                ))
+
+                if self.uses_local(field):
+                    self.local.evict(cache_key, field, tag, field_key)
+                    commands.append((
+                        "PUBLISH",
+                        self.invalidation_channel,
+                        self.build_invalidation_event(cache_key, field, tag, field_key)
+                    ))
+                    local_entries.append(((cache_key, field, tag, field_key), entry, self.namespace_ttl(field)))
+
+            if commands:
+                started = time.perf_counter()
+                await self.execute_pipeline(commands, transaction=True)
+                for field in {item[0] for item in items}:
+                    cache_metrics.observe_latency(field, "set_many", time.perf_counter() - started)
+                self.breaker.record_success()
 
-            await self.redis_client.hset(cache_key, field_key, json.dumps(value))
-            await self.redis_client.expire(cache_key, self.ttl)
+            for local_key, entry, ttl in local_entries:
+                self.local.set(local_key, entry, ttl)
         except Exception as e:
-            raise Exception(f"[h_set] Redis error: {str(e)}")
+            for field in {item[0] for item in items}:
+                self.handle_error("h_set_many", field, e)
 
-    # Get a specific field from the hash
+    # Get many fields in one round trip; items are (namespace, params) pairs
+    async def h_get_many(self, cache_key: str, items: list) -> list:
+        try:
+            values = [None] * len(items)
+            pending = []
+            commands = []
+            for index, (field, params) in enumerate(items):
+                tag, field_key = self.split_params(field, params)
+                local_key = (cache_key, field, tag, field_key)
+
+                if self.uses_local(field):
+                    self.ensure_listener()
+                    entry = self.local.get(local_key)
+                    if entry is not None:
+                        cache_metrics.record_hit(field, "local")
+                        values[index] = entry[0]
+                        continue
+
+                pending.append((index, field, local_key))
+                commands.append(self.script_command(
+                    self._get_script, cache_key, field, tag, [field_key, repr(time.time())]
+                ))
+
+            if commands and not self.redis_available():
+                return values
+
+            started = time.perf_counter()
+            results = await self.execute_pipeline(commands) if commands else []
+            for field in {item[1] for item in pending}:
+                cache_metrics.observe_latency(field, "get_many", time.perf_counter() - started)
+            if commands:
+                self.breaker.record_success()
+
+            for (index, field, local_key), data in zip(pending, results):
+                entry = self.decode_entry(field, data) if data else None
+                if entry is None:
+                    cache_metrics.record_miss(field)
+                    continue
+
+                cache_metrics.record_hit(field, "redis")
+                cache_metrics.observe_size(field, len(data))
+
+                if self.uses_local(field):
+                    self.local.set(local_key, entry, self.namespace_ttl(field))
+                values[index] = entry[0]
+            return values
+        except Exception as e:
+            for field in {item[0] for item in items}:
+                self.handle_error("h_get_many", field, e)
+            return [None] * len(items)
+
+    # Get a specific field from the namespace
     async def h_get(self, cache_key: str, field: str, params: dict = None):
+        entry = await self.read_entry(cache_key, field, params)
+        return entry[0] if entry is not None else None
+
+    # Read a cache entry (value, soft expiry, fill duration), trying the L1 layer first
+    async def read_entry(self, cache_key: str, field: str, params: dict = None, record_metrics: bool = True):
         try:
-            cache_key = self.build_cache_key(cache_key)
-            field_key = self.build_field_key(field, params)
+            tag, field_key = self.split_params(field, params)
+            local_key = (cache_key, field, tag, field_key)
+
+            if self.uses_local(field):
+                self.ensure_listener()
+                entry = self.local.get(local_key)
+                if entry is not None:
+                    if record_metrics:
+                        cache_metrics.record_hit(field, "local")
+                    return entry
+
+            if not self.redis_available():
+                if record_metrics:
+                    cache_metrics.record_miss(field)
+                return None
 
-            data = await self.redis_client.hget(cache_key, field_key)
-            if data:
-                return json.loads(data)
+            started = time.perf_counter()
+            data = await self._get_script(
+                keys=self.build_namespace_keys(cache_key, field, tag),
+                args=[field_key, repr(time.time())]
+            )
+            cache_metrics.observe_latency(field, "get", time.perf_counter() - started)
+            self.breaker.record_success()
+
+            entry = self.decode_entry(field, data) if data else None
+            if entry is not None:
+                if record_metrics:
+                    cache_metrics.record_hit(field, "redis")
+                    cache_metrics.observe_size(field, len(data))
+                if self.uses_local(field):
+                    self.local.set(local_key, entry, self.namespace_ttl(field))
+                return entry
         except Exception as e:
-            raise Exception(f"[h_get] Redis error: {str(e)}")
+            self.handle_error("h_get", field, e)
+
+        if record_metrics:
+            cache_metrics.record_miss(field)
         return None
 
-    # Delete a specific field in the hash
+    # Get a cached value or load it once, coalescing concurrent misses for the same key
+    async def get_or_set(self, cache_key: str, field: str, loader, params: dict = None, distributed: bool = False):
+        """Return the cached value, filling it from ``loader`` on a miss.
+
+        Concurrent misses in this process share one fill task. With
+        ``distributed`` a short Redis lock also lets a single worker run the
+        loader while the others poll for the filled value. In namespaces with
+        a ``soft_ttl``, stale entries are returned immediately while a single
+        background task refreshes them.
+        """
+        entry = await self.read_entry(cache_key, field, params)
+        if entry is not None:
+            value, soft_expiry, delta = entry
+            if soft_expiry is not None and self.should_refresh(soft_expiry, delta):
+                cache_metrics.record_stale(field)
+                self.start_fill(cache_key, field, loader, params, distributed, refresh=True)
+            return value
+
+        # Shield so a cancelled caller does not cancel the fill shared with others
+        return await asyncio.shield(self.start_fill(cache_key, field, loader, params, distributed))
+
+    # Get a cached (body, gzipped) response, rendering the loader's value through the response model on a miss
+    async def get_or_set_response(self, cache_key: str, field: str, loader, response_model, params: dict = None, distributed: bool = False) -> tuple:
+        """Like get_or_set, for namespaces flagged "response".
+
+        The value is validated and serialized once when it is loaded; hits
+        return the stored JSON bytes so routes can send them as-is.
+        """
+        async def render():
+            value = await loader()
+            return self.render_body(value, response_model) if value is not None else None
+
+        return await self.get_or_set(cache_key, field, render, params, distributed)
+
+    # Render a value to JSON bytes through its response model, gzipped when large enough
+    def render_body(self, value: any, response_model) -> tuple:
+        adapter = get_type_adapter(response_model)
+        body = adapter.dump_json(adapter.validate_python(value))
+
+        if self.response_gzip and len(body) >= self.codec.min_compress_bytes:
+            return gzip.compress(body, compresslevel=6, mtime=0), True
+        return body, False
+
+    # Start a fill task for the key, or join the one already in flight
+    def start_fill(self, cache_key: str, field: str, loader, params: dict = None, distributed: bool = False, refresh: bool = False) -> asyncio.Task:
+        tag, field_key = self.split_params(field, params)
+        flight_key = (self.prefix, cache_key, field, tag, field_key)
+
+        task = _inflight.get(flight_key)
+        if task is None:
+            task = asyncio.create_task(self.fill(cache_key, field, loader, params, distributed, refresh))
+            _inflight[flight_key] = task
+            task.add_done_callback(lambda t: self.finish_flight(flight_key, t))
+        return task
+
+    # Forget a finished fill task and log its failure, which background refreshes have no caller to report to
+    def finish_flight(self, flight_key: tuple, task: asyncio.Task):
+        if _inflight.get(flight_key) is task:
+            del _inflight[flight_key]
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("[fill] Cache fill failed for %s %s: %s", flight_key[2], flight_key[4], task.exception())
+
+    # Fill a cache entry, optionally under a cross-worker lock
+    async def fill(self, cache_key: str, field: str, loader, params: dict = None, distributed: bool = False, refresh: bool = False):
+        # Without Redis there is nothing to coordinate on, load directly
+        if not distributed or not self.redis_available():
+            return await self.load_and_store(cache_key, field, loader, params)
+
+        tag, field_key = self.split_params(field, params)
+        lock_key = f"{self.build_namespace_base(cache_key, field)}|lock{self.build_tag_suffix(tag)}|{field_key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis_client.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            self.handle_error("lock", field, e)
+            return await self.load_and_store(cache_key, field, loader, params)
+
+        if acquired:
+            try:
+                return await self.load_and_store(cache_key, field, loader, params)
+            finally:
+                try:
+                    await self._unlock_script(keys=[lock_key], args=[token])
+                except Exception as e:
+                    self.handle_error("unlock", field, e)
+
+        # A background refresh is already running on another worker
+        if refresh:
+            return None
+
+        # Another worker is filling: wait for its value while the lock is held.
+        # The caller's read already counted the miss, polls are not counted again.
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+
+            entry = await self.read_entry(cache_key, field, params, record_metrics=False)
+            if entry is not None:
+                return entry[0]
+            if not self.redis_available():
+                break
+            try:
+                if not await self.redis_client.exists(lock_key):
+                    break
+            except Exception as e:
+                self.handle_error("lock", field, e)
+                break
+
+        # The lock holder failed or timed out, load it ourselves
+        return await self.load_and_store(cache_key, field, loader, params)
+
+    # Run the loader and cache a non-empty result along with how long it took
+    async def load_and_store(self, cache_key: str, field: str, loader, params: dict = None):
+        started = time.monotonic()
+        try:
+            value = await loader()
+        except Exception:
+            cache_metrics.record_fill(field, time.monotonic() - started, failed=True)
+            raise
+
+        delta = time.monotonic() - started
+        cache_metrics.record_fill(field, delta)
+        if value is not None:
+            await self.h_set(cache_key, field, value, params, delta=delta)
+        return value
+
+    # Delete a specific field in the namespace
     async def h_del(self, cache_key: str, field: str, params: dict = None):
+        tag, field_key = self.split_params(field, params)
+        self.evict_local(cache_key, field, tag, field_key)
+
+        if not self.redis_available():
+            self.logger.warning("[h_del] Cache unavailable, %s not deleted", field)
+            return
+
         try:
-            cache_key = self.build_cache_key(cache_key)
-            field_key = self.build_field_key(field, params)
+            started = time.perf_counter()
+            await self.redis_client.hdel(self.build_namespace_keys(cache_key, field, tag)[1], field_key)
+            cache_metrics.observe_latency(field, "del", time.perf_counter() - started)
+            cache_metrics.record_invalidation(field)
+            self.breaker.record_success()
 
-            await self.redis_client.hdel(cache_key, field_key)
+            await self.publish_invalidation(cache_key, field, tag, field_key)
         except Exception as e:
-            raise Exception(f"[h_del] Redis error: {str(e)}")
+            self.handle_error("h_del", field, e)
+
+    # Delete many fields in one round trip; items are (namespace, params) pairs
+    async def h_del_many(self, cache_key: str, items: list):
+        commands = []
+        for field, params in items:
+            tag, field_key = self.split_params(field, params)
+            self.evict_local(cache_key, field, tag, field_key)
+            commands.append(("HDEL", self.build_namespace_keys(cache_key, field, tag)[1], field_key))
+            if self.uses_local(field):
+                commands.append(("PUBLISH", self.invalidation_channel, self.build_invalidation_event(cache_key, field, tag, field_key)))
+
+        if not commands:
+            return
+        if not self.redis_available():
+            self.logger.warning("[h_del_many] Cache unavailable, %d fields not deleted", len(items))
+            return
 
-    # Get all fields in the hash
-    async def h_keys(self, cache_key: str):
         try:
-            cache_key = self.build_cache_key(cache_key)
-            return await self.redis_client.hkeys(cache_key)
+            started = time.perf_counter()
+            await self.execute_pipeline(commands)
+            for field in {item[0] for item in items}:
+                cache_metrics.observe_latency(field, "del_many", time.perf_counter() - started)
+            for field, _ in items:
+                cache_metrics.record_invalidation(field)
+            self.breaker.record_success()
         except Exception as e:
-            raise Exception(f"[h_keys] Redis error: {str(e)}")
+            for field in {item[0] for item in items}:
+                self.handle_error("h_del_many", field, e)
+
+    # Get all fields cached for a namespace (and tag)
+    async def h_keys(self, cache_key: str, field: str, tag: str = None):
+        data = await self.h_get_all(cache_key, field, tag)
+        return list(data.keys())
+
+    # Get all fields and values cached for a namespace (and tag)
+    async def h_get_all(self, cache_key: str, field: str, tag: str = None):
+        if not self.redis_available():
+            return {}
 
-    # Get all fields and values in the hash
-    async def h_get_all(self, cache_key: str):
         try:
-            cache_key = self.build_cache_key(cache_key)
-            data = await self.redis_client.hgetall(cache_key)
-            return {k: json.loads(v) for k, v in data.items()}
+            data = await self._get_all_script(
+                keys=self.build_namespace_keys(cache_key, field, tag),
+                args=[repr(time.time())]
+            )
+            self.breaker.record_success()
+            entries = {k.decode("utf-8"): self.decode_entry(field, v) for k, v in zip(data[::2], data[1::2])}
+            return {k: entry[0] for k, entry in entries.items() if entry is not None}
         except Exception as e:
-            raise Exception(f"[h_get_all] Redis error: {str(e)}")
+            self.handle_error("h_get_all", field, e)
+            return {}
+
+    # Invalidate a namespace tag, or the whole namespace when no tag is given
+    async def invalidate(self, cache_key: str, namespace: str, tag: str = None):
+        """Drop cached entries in a single round trip.
+
+        A tag drops its own hash; a namespace bump moves readers to a fresh
+        generation, and entries written under older ones are dropped as they
+        are read.
+        """
+        self.evict_local(cache_key, namespace, str(tag) if tag is not None else None)
+
+        if not self.redis_available():
+            self.logger.warning("[invalidate] Cache unavailable, %s not invalidated", namespace)
+            return False
 
-    # Delete all fields matching a pattern (prefix match)
-    async def h_del_wildcard(self, cache_key: str, pattern: str):
         try:
-            cache_key = self.build_cache_key(cache_key)
-            all_keys = await self.redis_client.hkeys(cache_key)
+            keys = self.build_namespace_keys(cache_key, namespace, str(tag) if tag is not None else None)
 
-            # Match fields starting with the given pattern
-            keys_to_delete = [key for key in all_keys if key.startswith(pattern)]
+            started = time.perf_counter()
+            if tag is not None:
+                await self.redis_client.unlink(keys[1])
+            else:
+                await self.redis_client.incr(keys[0])
+            cache_metrics.observe_latency(namespace, "invalidate", time.perf_counter() - started)
+            cache_metrics.record_invalidation(namespace)
+            self.breaker.record_success()
 
-            if keys_to_delete:
-                await self.redis_client.hdel(cache_key, *keys_to_delete)
+            await self.publish_invalidation(cache_key, namespace, str(tag) if tag is not None else None)
+            return True
+        except Exception as e:
+            self.handle_error("invalidate", namespace, e)
+            return False
+
+    # Delete all fields matching a pattern ("namespace" or "namespace|tag_param=value")
+    async def h_del_wildcard(self, cache_key: str, pattern: str):
+        namespace, _, slug = pattern.partition("|")
+        params = dict(part.split("=", 1) for part in slug.split("|") if "=" in part)
+        tag, _ = self.split_params(namespace, params)
+        return await self.invalidate(cache_key, namespace, tag)
+
+    # Build the key of a not-found tombstone; long identifiers are hashed to bound key size
+    def build_tombstone_key(self, cache_key: str, kind: str, identifier: str) -> str:
+        identifier = str(identifier)
+        if len(identifier) > 64:
+            identifier = hashlib.sha1(identifier.encode("utf-8")).hexdigest()
+        return f"{self.build_cache_key(cache_key)}|missing|{kind}|{identifier}"
+
+    # Check whether a lookup is known to find nothing
+    async def is_missing(self, cache_key: str, kind: str, identifier: str) -> bool:
+        namespace = f"missing_{kind}"
+        if not self.redis_available():
+            return False
+
+        try:
+            started = time.perf_counter()
+            found = await self.redis_client.exists(self.build_tombstone_key(cache_key, kind, identifier))
+            cache_metrics.observe_latency(namespace, "get", time.perf_counter() - started)
+            self.breaker.record_success()
+        except Exception as e:
+            self.handle_error("is_missing", namespace, e)
+            return False
 
+        if found:
+            cache_metrics.record_hit(namespace, "redis")
             return True
+        cache_metrics.record_miss(namespace)
+        return False
+
+    # Remember for a short while that a lookup found nothing
+    async def mark_missing(self, cache_key: str, kind: str, identifier: str):
+        if not self.redis_available():
+            return
+
+        try:
+            await self.redis_client.set(self.build_tombstone_key(cache_key, kind, identifier), b"1", ex=self.negative_ttl)
+            self.breaker.record_success()
+        except Exception as e:
+            self.handle_error("mark_missing", f"missing_{kind}", e)
+
+    # Drop a tombstone once the entity exists
+    async def clear_missing(self, cache_key: str, kind: str, identifier: str):
+        if not self.redis_available():
+            self.logger.warning("[clear_missing] Cache unavailable, %s tombstone not cleared", kind)
+            return
+
+        try:
+            await self.redis_client.delete(self.build_tombstone_key(cache_key, kind, identifier))
+            cache_metrics.record_invalidation(f"missing_{kind}")
+            self.breaker.record_success()
         except Exception as e:
-            raise Exception(f"[h_del_wildcard] Redis error: {str(e)}")
+            self.handle_error("clear_missing", f"missing_{kind}", e)
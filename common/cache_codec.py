@@ -0,0 +1,124 @@
+# cache_codec.py
+import json
+import struct
+import zlib
+from config import config
+
+# Optional fast serializers/compressors, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Format marker: first byte is the serializer, second byte the compression
+SERIALIZER_MARKERS = {"json": b"j", "msgpack": b"m"}
+COMPRESSION_MARKERS = {"none": b"-", "zlib": b"z", "zstd": b"s"}
+
+# Pre-rendered response bodies: marker, gzip flag, then soft expiry and fill duration as doubles
+BODY_MARKER = b"r"
+BODY_GZIP_MARKER = b"g"
+BODY_HEADER = struct.Struct("!dd")
+
+class CacheCodec:
+    """Serializes cache payloads to bytes with a two-byte format marker.
+
+    Values above ``min_compress_bytes`` are compressed. Payloads without a
+    marker are decoded as plain JSON so entries written before the codec
+    existed keep working.
+    """
+
+    def __init__(self, serializer: str = None, compression: str = None, min_compress_bytes: int = None):
+        self.serializer = serializer or config["cache_codec"]
+        self.compression = compression or config["cache_compression"]
+        self.min_compress_bytes = min_compress_bytes if min_compress_bytes is not None else config["cache_compress_min_bytes"]
+
+        if self.serializer not in SERIALIZER_MARKERS:
+            raise ValueError(f"Unsupported cache serializer: {self.serializer}")
+        if self.compression not in COMPRESSION_MARKERS:
+            raise ValueError(f"Unsupported cache compression: {self.compression}")
+
+        # Fall back to what is available
+        if self.serializer == "msgpack" and msgpack is None:
+            self.serializer = "json"
+        if self.compression == "zstd" and zstandard is None:
+            self.compression = "zlib"
+
+        self.zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+        self.zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    # Serialize a value to bytes
+    def dumps(self, value: any) -> bytes:
+        if self.serializer == "msgpack":
+            return msgpack.packb(value, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    # Deserialize bytes written with the given serializer marker
+    def loads(self, marker: bytes, data: bytes) -> any:
+        if marker == SERIALIZER_MARKERS["msgpack"]:
+            if msgpack is None:
+                raise ValueError("msgpack is required to decode this cache entry")
+            return msgpack.unpackb(data, raw=False)
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    # Compress payloads large enough to benefit from it
+    def compress(self, data: bytes) -> tuple:
+        if self.compression == "none" or len(data) < self.min_compress_bytes:
+            return COMPRESSION_MARKERS["none"], data
+        if self.compression == "zstd":
+            return COMPRESSION_MARKERS["zstd"], self.zstd_compressor.compress(data)
+        return COMPRESSION_MARKERS["zlib"], zlib.compress(data, 6)
+
+    # Undo compress() for the given compression marker
+    def decompress(self, marker: bytes, data: bytes) -> bytes:
+        if marker == COMPRESSION_MARKERS["zstd"]:
+            if self.zstd_decompressor is None:
+                raise ValueError("zstandard is required to decode this cache entry")
+            return self.zstd_decompressor.decompress(data)
+        if marker == COMPRESSION_MARKERS["zlib"]:
+            return zlib.decompress(data)
+        return data
+
+    # Encode a value into a marked, optionally compressed payload
+    def encode(self, value: any) -> bytes:
+        compression_marker, data = self.compress(self.dumps(value))
+        return SERIALIZER_MARKERS[self.serializer] + compression_marker + data
+
+    # Decode a payload written by encode(), or a legacy plain JSON payload
+    def decode(self, payload: bytes) -> any:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+
+        serializer_marker, compression_marker = payload[:1], payload[1:2]
+        if serializer_marker not in SERIALIZER_MARKERS.values() or compression_marker not in COMPRESSION_MARKERS.values():
+            return json.loads(payload)
+
+        return self.loads(serializer_marker, self.decompress(compression_marker, payload[2:]))
+
+    # Encode a pre-rendered response body with its cache metadata
+    def encode_body(self, body: bytes, gzipped: bool, soft_expiry: float = None, delta: float = 0.0) -> bytes:
+        gzip_marker = BODY_GZIP_MARKER if gzipped else COMPRESSION_MARKERS["none"]
+        return BODY_MARKER + gzip_marker + BODY_HEADER.pack(soft_expiry or 0.0, delta) + body
+
+    # Decode a payload written by encode_body() into (body, gzipped, soft_expiry, delta)
+    def decode_body(self, payload: bytes):
+        # Entries cached before the namespace stored bodies are treated as misses
+        if payload[:1] != BODY_MARKER:
+            return None
+
+        soft_expiry, delta = BODY_HEADER.unpack_from(payload, 2)
+        body = payload[2 + BODY_HEADER.size:]
+        return body, payload[1:2] == BODY_GZIP_MARKER, (soft_expiry or None), delta
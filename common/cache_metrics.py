@@ -0,0 +1,130 @@
+# cache_metrics.py
+import bisect
+import time
+from collections import defaultdict
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+class Histogram:
+    """Bucketed histogram (per-bucket, non-cumulative counts) with count and sum."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    # Record a single observation
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    # Export bucket counts keyed by upper bound
+    def snapshot(self) -> dict:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "buckets": dict(zip(bounds, self.counts))
+        }
+
+class NamespaceMetrics:
+    """Counters and histograms for one cache namespace."""
+
+    def __init__(self):
+        self.hits = defaultdict(int)
+        self.misses = 0
+        self.stale_hits = 0
+        self.fills = 0
+        self.fill_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.errors = 0
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.fill_latency = Histogram(LATENCY_BUCKETS)
+        self.payload_bytes = Histogram(SIZE_BUCKETS)
+
+    # Export the namespace metrics
+    def snapshot(self) -> dict:
+        hits = sum(self.hits.values())
+        lookups = hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "fills": self.fills,
+            "fill_errors": self.fill_errors,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "latency": {op: histogram.snapshot() for op, histogram in self.latency.items()},
+            "fill_latency": self.fill_latency.snapshot(),
+            "payload_bytes": self.payload_bytes.snapshot()
+        }
+
+class CacheMetrics:
+    """Per-process cache metrics, grouped by namespace."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.namespaces = defaultdict(NamespaceMetrics)
+
+    # Count a hit served by the given layer ("local" or "redis")
+    def record_hit(self, namespace: str, layer: str):
+        self.namespaces[namespace].hits[layer] += 1
+
+    # Count a miss
+    def record_miss(self, namespace: str):
+        self.namespaces[namespace].misses += 1
+
+    # Count a stale entry served while it is refreshed
+    def record_stale(self, namespace: str):
+        self.namespaces[namespace].stale_hits += 1
+
+    # Record a loader run and how long it took
+    def record_fill(self, namespace: str, seconds: float, failed: bool = False):
+        metrics = self.namespaces[namespace]
+        metrics.fills += 1
+        metrics.fill_latency.observe(seconds)
+        if failed:
+            metrics.fill_errors += 1
+
+    # Count entries dropped from the local layer for lack of room
+    def record_eviction(self, namespace: str, count: int = 1):
+        self.namespaces[namespace].evictions += count
+
+    # Count an explicit invalidation
+    def record_invalidation(self, namespace: str):
+        self.namespaces[namespace].invalidations += 1
+
+    # Count a Redis error
+    def record_error(self, namespace: str):
+        self.namespaces[namespace].errors += 1
+
+    # Record the latency of a Redis operation
+    def observe_latency(self, namespace: str, operation: str, seconds: float):
+        self.namespaces[namespace].latency[operation].observe(seconds)
+
+    # Record the size of a stored or fetched payload
+    def observe_size(self, namespace: str, size: int):
+        self.namespaces[namespace].payload_bytes.observe(size)
+
+    # Export every namespace
+    def snapshot(self) -> dict:
+        return {
+            "since": self.started_at,
+            "namespaces": {name: metrics.snapshot() for name, metrics in sorted(self.namespaces.items())}
+        }
+
+    # Clear all collected metrics
+    def reset(self):
+        self.started_at = time.time()
+        self.namespaces.clear()
+
+# Shared by every RedisHashCache in the process
+cache_metrics = CacheMetrics()
@@ -0,0 +1,60 @@
+# circuit_breaker.py
+import time
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker guarding calls to a flaky dependency.
+
+    Opens after ``failure_threshold`` consecutive failures. Once
+    ``reset_timeout`` seconds have passed it lets a single trial call through
+    (half-open); success closes it again, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = None
+
+    # Check whether a call may go through right now
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_started_at = None
+
+        # Half-open: one trial at a time, a trial that never reported back expires
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False
+
+        self.trial_started_at = now
+        return True
+
+    # Record a successful call
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_started_at = None
+
+    # Record a failed call, opening the breaker when needed
+    def record_failure(self):
+        self.failures += 1
+        self.trial_started_at = None
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    # Export the breaker state
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures}
@@ -1,16 +1,137 @@
 from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
 from fastapi import HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+import asyncio
+import threading
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps the event loop free
+_executor = None
+_executor_lock = threading.Lock()
+
+class HasherStats:
+    """Process-wide counters for the password hashing pool."""
 
-class PasswordHasher:
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    # Count a call waiting for a worker
+    def enqueue(self):
+        with self.lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+    # Move a call from the queue to a worker
+    def start(self):
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+
+    # Count a finished call
+    def finish(self):
+        with self.lock:
+            self.active -= 1
+            self.completed += 1
+
+    # Export the counters
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "queued": self.queued,
+                "active": self.active,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed
+            }
+
+# Shared by every PasswordHasher in the process
+hasher_stats = HasherStats()
+
+# Create the hashing pool on first use
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config["password_hash_workers"],
+                thread_name_prefix="password-hash"
+            )
+        return _executor
+
+class PasswordHasher:
+    """bcrypt hashing run off the event loop in a bounded worker pool.
+
+    Hashes made with a different work factor than ``bcrypt_rounds`` are
+    reported by ``verify_and_update`` so callers can store an upgraded hash.
+    """
+
+    def __init__(self, rounds: int = None, max_queue: int = None):
+        self.rounds = rounds or config["bcrypt_rounds"]
+        self.max_queue = max_queue if max_queue is not None else config["password_hash_max_queue"]
+        self.pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=self.rounds,
+            bcrypt__min_rounds=self.rounds,
+            bcrypt__max_rounds=self.rounds
+        )
+
+    # Run a blocking hash call in the pool, rejecting work when the queue is full
+    async def run(self, func, *args):
+        if hasher_stats.queued >= self.max_queue:
+            with hasher_stats.lock:
+                hasher_stats.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+
+        state = {"started": False, "cancelled": False}
 
-    def hash(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        def task():
+            with hasher_stats.lock:
+                if state["cancelled"]:
+                    return None
+                state["started"] = True
+            hasher_stats.start()
+            try:
+                return func(*args)
+            finally:
+                hasher_stats.finish()
 
-    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        hasher_stats.enqueue()
         try:
-            return self.pwd_context.verify(plain_password, hashed_password)
+            return await asyncio.get_running_loop().run_in_executor(get_executor(), task)
+        except asyncio.CancelledError:
+            # A cancelled caller frees its queue slot if the work never started
+            with hasher_stats.lock:
+                if not state["started"]:
+                    state["cancelled"] = True
+                    hasher_stats.queued -= 1
+            raise
+
+    # Hash a password
+    async def hash(self, password: str) -> str:
+        return await self.run(self.pwd_context.hash, password)
+
+    # Verify a password against its hash
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        valid, _ = await self.verify_and_update(plain_password, hashed_password)
+        return valid
+
+    # Verify a password and return a rehashed value when the stored work factor is outdated
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple:
+        try:
+            valid, new_hash = await self.run(self.pwd_context.verify_and_update, plain_password, hashed_password)
         except UnknownHashError:
             raise HTTPException(status_code=400, detail="Invalid password hash format")
+
+        if valid and new_hash:
+            with hasher_stats.lock:
+                hasher_stats.rehashed += 1
+        return valid, new_hash
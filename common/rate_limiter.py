@@ -0,0 +1,148 @@
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from fastapi import HTTPException, Request
+from common.cache import get_redis_client, redis_breaker
+from config import config
+
+# Per-route limits as "scope:limit/window_seconds" pairs, scopes being "ip" and "email"
+RATE_LIMIT_POLICIES = {
+    "admin_login": config["rate_limit_admin_login"],
+    "user_login": config["rate_limit_user_login"],
+    "forgot_password": config["rate_limit_forgot_password"],
+}
+
+# Sliding-window log over sorted sets, checking every key before recording the attempt in any.
+# KEYS = one sorted set per scope, sharing the policy's hash tag so they map to one cluster slot,
+# ARGV[1] = now (ms), ARGV[2] = attempt id, then a (limit, window ms) pair per key. Returns {allowed, retry_after_ms}.
+_SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return {0, retry_after}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 + i * 2]))
+end
+return {1, 0}
+"""
+
+# Parse "ip:10/60,email:5/300" into {"ip": (10, 60), "email": (5, 300)}
+def parse_policy(policy: str) -> dict:
+    limits = {}
+    for entry in filter(None, (part.strip() for part in policy.split(","))):
+        scope, _, rule = entry.partition(":")
+        limit, _, window = rule.partition("/")
+        limits[scope.strip()] = (int(limit), int(window))
+    return limits
+
+class LocalSlidingWindow:
+    """In-process sliding-window log used while Redis is unavailable."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.attempts = OrderedDict()
+
+    # Check and record one attempt against several (key, limit, window) rules
+    def hit(self, rules: list, now: float) -> float:
+        retry_after = 0.0
+        for key, limit, window in rules:
+            attempts = self.attempts.get(key)
+            if attempts is None:
+                continue
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            if len(attempts) >= limit:
+                retry_after = max(retry_after, attempts[0] + window - now)
+
+        if retry_after > 0:
+            return retry_after
+
+        for key, _, _ in rules:
+            self.attempts.setdefault(key, deque()).append(now)
+            self.attempts.move_to_end(key)
+        while len(self.attempts) > self.max_keys:
+            self.attempts.popitem(last=False)
+        return 0.0
+
+class RateLimiter:
+    """Per-route attempt limits keyed by client IP and email, enforced in Redis.
+
+    Falls back to a per-worker window when Redis is down, so limits still
+    hold per process instead of disappearing.
+    """
+
+    def __init__(self):
+        self.redis_client = get_redis_client()
+        self.breaker = redis_breaker
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.prefix = config["cache_prefix"]
+        self.policies = {name: parse_policy(policy) for name, policy in RATE_LIMIT_POLICIES.items()}
+        self.local = LocalSlidingWindow()
+        self._script = self.redis_client.register_script(_SLIDING_WINDOW_SCRIPT)
+
+    # Client address used for the "ip" scope
+    def client_ip(self, request: Request) -> str:
+        if config["rate_limit_trust_forwarded_for"]:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    # Build the (key, limit, window) rules of a policy for this request, the policy name being the keys' hash tag
+    def build_rules(self, policy: str, request: Request, email: str = None) -> list:
+        identities = {"ip": self.client_ip(request), "email": email.strip().lower() if email else None}
+
+        rules = []
+        for scope, (limit, window) in self.policies[policy].items():
+            identity = identities.get(scope)
+            if identity:
+                rules.append((f"{{{self.prefix}|ratelimit|{policy}}}|{scope}|{identity}", limit, window))
+        return rules
+
+    # Record an attempt, returning how many seconds to wait when it is over the limit
+    async def hit(self, policy: str, request: Request, email: str = None) -> float:
+        rules = self.build_rules(policy, request, email)
+        if not rules:
+            return 0.0
+
+        if self.breaker.allow_request():
+            try:
+                args = [int(time.time() * 1000), uuid.uuid4().hex]
+                for _, limit, window in rules:
+                    args.extend([limit, window * 1000])
+
+                allowed, retry_after_ms = await self._script(keys=[key for key, _, _ in rules], args=args)
+                self.breaker.record_success()
+                return 0.0 if allowed else int(retry_after_ms) / 1000
+            except Exception as e:
+                self.breaker.record_failure()
+                self.logger.warning("[hit] Rate limit check failed for %s, using local limits: %s", policy, e)
+
+        return self.local.hit(rules, time.time())
+
+    # Reject the request with 429 and Retry-After when it is over the limit
+    async def enforce(self, policy: str, request: Request, email: str = None):
+        retry_after = await self.hit(policy, request, email)
+        if retry_after > 0:
+            self.logger.warning("Rate limit %s exceeded for %s", policy, self.client_ip(request))
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts, please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+# Shared by the auth routes
+rate_limiter = RateLimiter()
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import logging
+import time
+from common.cache import get_redis_client, redis_breaker
+from config import config
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one BLAKE2b digest."""
+
+    def __init__(self, size_bits: int, hash_count: int):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    # Bit positions of a value
+    def positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.size_bits for i in range(self.hash_count)]
+
+    # Add a value
+    def add(self, value: str):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    # Check whether a value may have been added (false positives possible, no false negatives)
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+class RevocationList:
+    """Revoked token ids (``jti``) kept in Redis until the token would have expired.
+
+    Each worker mirrors them in a Bloom filter, rebuilt from Redis on startup and
+    every ``rebuild_interval`` seconds and kept current through pub/sub, so the
+    usual "not revoked" answer needs no network call. Filter hits are confirmed
+    in Redis to rule out false positives.
+    """
+
+    def __init__(self):
+        self.redis_client = get_redis_client()
+        self.breaker = redis_breaker
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.prefix = config["cache_prefix"]
+        self.index_key = f"{self.prefix}|revoked_tokens"
+        self.channel = f"{self.prefix}|revoked_tokens|events"
+        self.size_bits = config["token_revocation_bloom_bits"]
+        self.hash_count = config["token_revocation_bloom_hashes"]
+        self.rebuild_interval = config["token_revocation_rebuild_interval"]
+        self.bloom = None
+        self.listener_task = None
+
+    # Redis key marking one token id as revoked
+    def build_key(self, jti: str) -> str:
+        return f"{self.prefix}|revoked|{jti}"
+
+    # Start the per-process listener once an event loop is running
+    def ensure_listener(self):
+        if self.listener_task is None or self.listener_task.done():
+            self.listener_task = asyncio.create_task(self.listen())
+
+    # Rebuild the Bloom filter from the still-unexpired revocations in Redis
+    async def rebuild(self):
+        now = time.time()
+        await self.redis_client.zremrangebyscore(self.index_key, "-inf", now)
+        revoked = await self.redis_client.zrangebyscore(self.index_key, now, "+inf")
+
+        bloom = BloomFilter(self.size_bits, self.hash_count)
+        for jti in revoked:
+            bloom.add(jti.decode("utf-8") if isinstance(jti, bytes) else jti)
+        self.bloom = bloom
+        self.logger.info("Revocation filter rebuilt with %d token ids", len(revoked))
+
+    # Keep the Bloom filter in sync with revocations made by other workers
+    async def listen(self):
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+
+                # Revocations may have been missed while disconnected
+                await self.rebuild()
+                rebuilt_at = time.monotonic()
+
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message.get("type") == "message":
+                        data = message["data"]
+                        self.bloom.add(data.decode("utf-8") if isinstance(data, bytes) else data)
+
+                    # Periodic rebuilds drop expired ids, which a Bloom filter cannot remove
+                    if time.monotonic() - rebuilt_at >= self.rebuild_interval:
+                        await self.rebuild()
+                        rebuilt_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("[listen] Revocation listener error: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    # Revoke a token id until its expiry (a unix timestamp); False when Redis could not record it
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        remaining = int(expires_at - time.time()) + 1
+        if not jti or remaining <= 0:
+            return True
+
+        # Added to this worker's filter first, which is_revoked trusts while Redis is down
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+        if not self.breaker.allow_request():
+            self.logger.warning("[revoke] Redis unavailable, token %s revoked on this worker only", jti)
+            return False
+
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(self.build_key(jti), b"1", ex=remaining)
+                pipe.zadd(self.index_key, {jti: expires_at})
+                pipe.publish(self.channel, jti)
+                await pipe.execute()
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            self.logger.warning("[revoke] Revocation of %s failed: %s", jti, e)
+            return False
+
+        self.logger.info("Token %s revoked for %d seconds", jti, remaining)
+        return True
+
+    # Check whether a token id has been revoked
+    async def is_revoked(self, jti: str) -> bool:
+        if not jti:
+            return False
+
+        self.ensure_listener()
+
+        # Fast path: a filter miss means the id was never revoked
+        if self.bloom is not None and jti not in self.bloom:
+            return False
+
+        if not self.breaker.allow_request():
+            # Without Redis a filter hit is treated as revoked, an unloaded filter as not revoked
+            return self.bloom is not None
+
+        try:
+            revoked = await self.redis_client.exists(self.build_key(jti))
+            self.breaker.record_success()
+            return bool(revoked)
+        except Exception as e:
+            self.breaker.record_failure()
+            self.logger.warning("[is_revoked] Revocation lookup failed for %s: %s", jti, e)
+            return self.bloom is not None
+
+# Shared by the auth guard and sign-out
+revocation_list = RevocationList()
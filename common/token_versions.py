@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from bson import ObjectId, errors as bson_errors
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from common.cache import get_redis_client, redis_breaker
+from config import config
+from db import db
+
+# Collection holding the accounts of each token role
+ROLE_COLLECTIONS = {"admin": "admins", "user": "users"}
+
+# Stored for accounts that are missing or inactive, never matches a token
+INACTIVE_VERSION = -1
+
+class TokenVersionStore:
+    """Per-account session version checked against the ``token_version`` claim.
+
+    Mongo holds the durable counter, Redis caches it per account and each
+    worker keeps it for ``local_ttl`` seconds. Bumping the counter (sign-out,
+    deactivation) invalidates every token issued before.
+    """
+
+    def __init__(self):
+        self.redis_client = get_redis_client()
+        self.breaker = redis_breaker
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.prefix = config["cache_prefix"]
+        self.ttl = 600  # Seconds a version stays in Redis, bounds staleness if a bump could not reach Redis
+        self.local_ttl = config["token_version_local_ttl"]
+        self.local_max_entries = config["auth_token_cache_size"]
+        self.local = OrderedDict()
+        self.retries = set()  # Background invalidations of versions a bump could not write to Redis
+
+    # Redis key holding an account's version
+    def build_key(self, role: str, account_id: str) -> str:
+        return f"{self.prefix}|token_version|{role}|{account_id}"
+
+    # Load the version of an active account from Mongo
+    async def load(self, role: str, account_id: str) -> int:
+        collection = ROLE_COLLECTIONS.get(role)
+        if collection is None:
+            return INACTIVE_VERSION
+
+        try:
+            account = await db[collection].find_one(
+                {"_id": ObjectId(account_id), "is_active": True},
+                {"_id": 0, "token_version": 1}
+            )
+        except bson_errors.InvalidId:
+            return INACTIVE_VERSION
+        return int(account.get("token_version", 0)) if account else INACTIVE_VERSION
+
+    # Get the current version of an account, trying the local copy, then Redis, then Mongo
+    async def current(self, role: str, account_id: str) -> int:
+        key = self.build_key(role, account_id)
+        cached = self.local.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        version = None
+        if self.breaker.allow_request():
+            try:
+                value = await self.redis_client.get(key)
+                self.breaker.record_success()
+                version = int(value) if value is not None else None
+            except Exception as e:
+                self.breaker.record_failure()
+                self.logger.warning("[current] Token version lookup failed for %s: %s", key, e)
+
+        if version is None:
+            version = await self.load(role, account_id)
+            await self.store(key, version)
+
+        self.remember(key, version)
+        return version
+
+    # Keep a version in the bounded per-worker copy
+    def remember(self, key: str, version: int):
+        self.local[key] = (version, time.monotonic() + self.local_ttl)
+        self.local.move_to_end(key)
+        while len(self.local) > self.local_max_entries:
+            self.local.popitem(last=False)
+
+    # Cache a version in Redis, ignoring outages; False when it could not be written
+    async def store(self, key: str, version: int) -> bool:
+        if not self.breaker.allow_request():
+            return False
+
+        try:
+            await self.redis_client.set(key, version, ex=self.ttl)
+            self.breaker.record_success()
+            return True
+        except Exception as e:
+            self.breaker.record_failure()
+            self.logger.warning("[store] Token version write failed for %s: %s", key, e)
+            return False
+
+    # Keep deleting a version Redis may still hold stale until it succeeds or the entry has expired on its own
+    async def retry_invalidate(self, key: str):
+        deadline = time.monotonic() + self.ttl
+        delay = 1.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            if not self.breaker.allow_request():
+                continue
+
+            try:
+                # Deleting rather than rewriting cannot race a later bump, readers reload from Mongo
+                await self.redis_client.delete(key)
+                self.breaker.record_success()
+                self.logger.info("[retry_invalidate] Stale token version %s invalidated", key)
+                return
+            except Exception as e:
+                self.breaker.record_failure()
+                self.logger.warning("[retry_invalidate] Token version delete failed for %s: %s", key, e)
+
+    # Invalidate every token of an account issued so far; False when Redis may still serve the old version for a while
+    async def bump(self, role: str, account_id: str) -> bool:
+        collection = ROLE_COLLECTIONS[role]
+        try:
+            account = await db[collection].find_one_and_update(
+                {"_id": ObjectId(account_id)},
+                {"$inc": {"token_version": 1}},
+                projection={"_id": 0, "token_version": 1, "is_active": 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except (PyMongoError, bson_errors.InvalidId) as e:
+            self.logger.error("[bump] Could not bump token version for %s %s: %s", role, account_id, e)
+            raise
+
+        version = INACTIVE_VERSION
+        if account and account.get("is_active", False):
+            version = int(account["token_version"])
+
+        key = self.build_key(role, account_id)
+        self.remember(key, version)
+        if await self.store(key, version):
+            return True
+
+        # Other workers would keep accepting old tokens until the Redis entry expires, keep retrying in the background
+        self.logger.error("[bump] Token version of %s %s not written to Redis, retrying invalidation", role, account_id)
+        task = asyncio.create_task(self.retry_invalidate(key))
+        self.retries.add(task)
+        task.add_done_callback(self.retries.discard)
+        return False
+
+    # Check whether a verified token payload still matches its account's version
+    async def is_current(self, payload: dict) -> bool:
+        role, account_id = payload.get("role"), payload.get("id")
+        if not role or not account_id:
+            return False
+
+        version = await self.current(role, account_id)
+        return version != INACTIVE_VERSION and payload.get("token_version", 0) == version
+
+# Shared by the auth guard and token issuing
+token_versions = TokenVersionStore()
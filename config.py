@@ -18,6 +18,13 @@ app_env = os.getenv("APP_ENV", "development")
 base_url = os.getenv("BASE_URL", "http://localhost:8000")
 mongo_url = os.getenv("MONGO_URL")
 mongo_db = os.getenv("MONGO_DB")
+mongo_ensure_indexes = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+pagination_total_mode = os.getenv("PAGINATION_TOTAL_MODE", "counter").lower()
+channel_catalog_enabled = os.getenv("CHANNEL_CATALOG_ENABLED", "true").lower() == "true"
+channel_catalog_poll_interval = float(os.getenv("CHANNEL_CATALOG_POLL_INTERVAL", 30))
+channel_order_mode = os.getenv("CHANNEL_ORDER_MODE", "shift").lower()
+channel_order_min_gap = float(os.getenv("CHANNEL_ORDER_MIN_GAP", 1e-6))
+playlist_max_per_user = int(os.getenv("PLAYLIST_MAX_PER_USER", 20))
 secret_key = os.getenv("SECRET_KEY")
 algorithm = os.getenv("ALGORITHM", "HS256")
 token_expiry = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
@@ -31,11 +38,38 @@ mail_password = os.getenv("MAIL_PASSWORD")
 mail_from = os.getenv("MAIL_FROM")
 mail_from_name = os.getenv("MAIL_FROM_NAME", "APP Support")
 file_download_dir = os.getenv("FILE_DOWNLOAD_DIR", "downloads")
+signed_url_keys = os.getenv("SIGNED_URL_KEYS", "")
+signed_url_active_key = os.getenv("SIGNED_URL_ACTIVE_KEY", "")
 ffmpeg_path = os.getenv("FFMPEG_PATH")
 redis_host = os.getenv("REDIS_HOST", "localhost")
 redis_port = int(os.getenv("REDIS_PORT", 6379))
 redis_db = int(os.getenv("REDIS_DB", 0))
+redis_max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+redis_socket_timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+redis_socket_connect_timeout = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 0.5))
+cache_breaker_failure_threshold = int(os.getenv("CACHE_BREAKER_FAILURE_THRESHOLD", 5))
+cache_breaker_reset_timeout = float(os.getenv("CACHE_BREAKER_RESET_TIMEOUT", 10))
 cache_prefix = os.getenv("CACHE_PREFIX", "app_cache")
+cache_l1_enabled = os.getenv("CACHE_L1_ENABLED", "false").lower() == "true"
+cache_l1_max_entries = int(os.getenv("CACHE_L1_MAX_ENTRIES", 2048))
+cache_l1_ttl = int(os.getenv("CACHE_L1_TTL", 30))
+cache_codec = os.getenv("CACHE_CODEC", "json")
+cache_compression = os.getenv("CACHE_COMPRESSION", "zlib")
+cache_compress_min_bytes = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+cache_response_gzip = os.getenv("CACHE_RESPONSE_GZIP", "true").lower() == "true"
+cache_negative_ttl = int(os.getenv("CACHE_NEGATIVE_TTL", 60))
+bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+password_hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+password_hash_max_queue = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+auth_token_cache_size = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+token_version_local_ttl = float(os.getenv("TOKEN_VERSION_LOCAL_TTL", 5))
+token_revocation_bloom_bits = int(os.getenv("TOKEN_REVOCATION_BLOOM_BITS", 1048576))
+token_revocation_bloom_hashes = int(os.getenv("TOKEN_REVOCATION_BLOOM_HASHES", 7))
+token_revocation_rebuild_interval = int(os.getenv("TOKEN_REVOCATION_REBUILD_INTERVAL", 300))
+rate_limit_admin_login = os.getenv("RATE_LIMIT_ADMIN_LOGIN", "ip:10/60,email:5/300")
+rate_limit_user_login = os.getenv("RATE_LIMIT_USER_LOGIN", "ip:20/60,email:5/300")
+rate_limit_forgot_password = os.getenv("RATE_LIMIT_FORGOT_PASSWORD", "ip:5/600,email:3/3600")
+rate_limit_trust_forwarded_for = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
 frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 # Validate critical environment variables
@@ -65,6 +99,10 @@ if not ffmpeg_path:
     raise EnvironmentError("FFMPEG_PATH environment variable is not set.")
 if not mongo_url or not mongo_db:
     raise EnvironmentError("MONGO_URL and MONGO_DB environment variables must be set.")
+if pagination_total_mode not in ("counter", "exact", "estimated"):
+    raise EnvironmentError("PAGINATION_TOTAL_MODE must be one of counter, exact or estimated.")
+if channel_order_mode not in ("shift", "fractional"):
+    raise EnvironmentError("CHANNEL_ORDER_MODE must be shift or fractional.")
 if not frontend_url or not frontend_url.startswith("http"):
     raise EnvironmentError("FRONTEND_URL environment variable must be set and start with http or https.")
 
@@ -75,6 +113,13 @@ config = {
     "base_url": base_url,
     "mongo_url": mongo_url,
     "mongo_db": mongo_db,
+    "mongo_ensure_indexes": mongo_ensure_indexes,
+    "pagination_total_mode": pagination_total_mode,
+    "channel_catalog_enabled": channel_catalog_enabled,
+    "channel_catalog_poll_interval": channel_catalog_poll_interval,
+    "channel_order_mode": channel_order_mode,
+    "channel_order_min_gap": channel_order_min_gap,
+    "playlist_max_per_user": playlist_max_per_user,
     "secret_key": secret_key,
     "algorithm": algorithm,
     "token_expiry": token_expiry,
@@ -88,11 +133,38 @@ config = {
     "mail_from": mail_from,
     "mail_from_name": mail_from_name,
     "file_download_dir": file_download_dir,
+    "signed_url_keys": signed_url_keys,
+    "signed_url_active_key": signed_url_active_key,
     "ffmpeg_path": ffmpeg_path,
     "redis_host": redis_host,
     "redis_port": redis_port,
     "redis_db": redis_db,
+    "redis_max_connections": redis_max_connections,
+    "redis_socket_timeout": redis_socket_timeout,
+    "redis_socket_connect_timeout": redis_socket_connect_timeout,
+    "cache_breaker_failure_threshold": cache_breaker_failure_threshold,
+    "cache_breaker_reset_timeout": cache_breaker_reset_timeout,
     "cache_prefix": cache_prefix,
+    "cache_l1_enabled": cache_l1_enabled,
+    "cache_l1_max_entries": cache_l1_max_entries,
+    "cache_l1_ttl": cache_l1_ttl,
+    "cache_codec": cache_codec,
+    "cache_compression": cache_compression,
+    "cache_compress_min_bytes": cache_compress_min_bytes,
+    "cache_response_gzip": cache_response_gzip,
+    "cache_negative_ttl": cache_negative_ttl,
+    "bcrypt_rounds": bcrypt_rounds,
+    "password_hash_workers": password_hash_workers,
+    "password_hash_max_queue": password_hash_max_queue,
+    "auth_token_cache_size": auth_token_cache_size,
+    "token_version_local_ttl": token_version_local_ttl,
+    "token_revocation_bloom_bits": token_revocation_bloom_bits,
+    "token_revocation_bloom_hashes": token_revocation_bloom_hashes,
+    "token_revocation_rebuild_interval": token_revocation_rebuild_interval,
+    "rate_limit_admin_login": rate_limit_admin_login,
+    "rate_limit_user_login": rate_limit_user_login,
+    "rate_limit_forgot_password": rate_limit_forgot_password,
+    "rate_limit_trust_forwarded_for": rate_limit_trust_forwarded_for,
     "cache_key": f"{app_name}_app_data",
     "frontend_url": frontend_url
 }
@@ -0,0 +1,100 @@
+# counters.py
+import argparse
+import asyncio
+import logging
+import sys
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from db.conn import db
+
+logger = logging.getLogger("counters")
+
+# Global counters live in the "counters" collection as {"_id": name, "value": n}
+ACTIVE_USERS = "active_users"
+
+# Per-channel count of ready stories, kept on the channel document
+CHANNEL_READY_STORIES = "ready_story_count"
+
+# Attempts at replacing a counter that concurrent $inc writes keep moving while it is recounted
+REBUILD_ATTEMPTS = 5
+
+# Set a counter to a fresh count unless a concurrent $inc moved it meanwhile, retrying with a new count then.
+# find_counter returns the counter's current value (None when missing), store applies {"$set"} conditionally
+async def recount(find_counter, count, store) -> tuple:
+    for _ in range(REBUILD_ATTEMPTS):
+        previous = await find_counter()
+        value = await count()
+        try:
+            if await store(previous, value):
+                return value, True
+        except DuplicateKeyError:
+            pass  # Created concurrently, recount against it
+    return value, False
+
+# Recount the global active-user counter
+async def rebuild_active_users(database=db) -> tuple:
+    async def find_counter():
+        counter = await database.counters.find_one({"_id": ACTIVE_USERS}, {"value": 1})
+        return counter["value"] if counter else None
+
+    async def store(previous, value):
+        # Upserting only while missing: an existing counter whose value moved makes the filter miss
+        result = await database.counters.update_one(
+            {"_id": ACTIVE_USERS, "value": previous}, {"$set": {"value": value}}, upsert=previous is None
+        )
+        return result.matched_count == 1 or result.upserted_id is not None
+
+    return await recount(find_counter, lambda: database.users.count_documents({"is_active": True}), store)
+
+# Recount the ready stories of one channel, channels without stories included
+async def rebuild_channel_stories(channel_id, database=db) -> tuple:
+    async def find_counter():
+        channel = await database.channels.find_one({"_id": channel_id}, {CHANNEL_READY_STORIES: 1})
+        return channel.get(CHANNEL_READY_STORIES) if channel else None
+
+    async def store(previous, value):
+        # A None filter also matches a channel not backfilled yet
+        result = await database.channels.update_one(
+            {"_id": channel_id, CHANNEL_READY_STORIES: previous}, {"$set": {CHANNEL_READY_STORIES: value}}
+        )
+        return result.matched_count == 1
+
+    return await recount(
+        find_counter, lambda: database.audio_stories.count_documents({"channel_id": channel_id, "is_ready": True}), store
+    )
+
+# Recount every maintained counter from the source collections. Safe while the API is serving:
+# a counter is only replaced if no $inc landed between reading it and counting, and recounted otherwise
+async def rebuild_counters(database=db) -> dict:
+    active_users, stored = await rebuild_active_users(database)
+    unsettled = [] if stored else [ACTIVE_USERS]
+
+    channels = [channel["_id"] async for channel in database.channels.find({}, {"_id": 1})]
+    for channel_id in channels:
+        _, stored = await rebuild_channel_stories(channel_id, database)
+        if not stored:
+            unsettled.append(str(channel_id))
+
+    if unsettled:
+        logger.warning("Counters kept moving during the rebuild, rerun for: %s", ", ".join(unsettled))
+    logger.info("Counters rebuilt: %d active users, %d channels", active_users, len(channels))
+    return {"active_users": active_users, "channels": len(channels), "unsettled": unsettled}
+
+# CLI: python -m db.counters rebuild
+async def main(command: str) -> int:
+    if command == "rebuild":
+        try:
+            result = await rebuild_counters()
+        except PyMongoError as e:
+            logger.error("Could not rebuild counters: %s", e)
+            return 1
+        if result["unsettled"]:
+            print(f"PARTIAL counters still moving, rerun for: {', '.join(result['unsettled'])}")
+            return 1
+        print(f"OK {result['active_users']} active users, {result['channels']} channels recounted")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Rebuild maintained MongoDB counters")
+    parser.add_argument("command", choices=["rebuild"])
+    sys.exit(asyncio.run(main(parser.parse_args().command)))
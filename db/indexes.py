@@ -0,0 +1,173 @@
+# indexes.py
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from db.conn import db
+
+logger = logging.getLogger("indexes")
+
+# Indexes backing every service query shape, per collection
+INDEXES = {
+    "audio_stories": [
+        IndexModel([("channel_id", ASCENDING), ("is_ready", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="channel_ready_created_id"),
+        IndexModel([("channel_id", ASCENDING), ("file_path", ASCENDING)], name="channel_file_path"),
+    ],
+    "channels": [
+        IndexModel([("is_active", ASCENDING), ("order_position", ASCENDING), ("_id", ASCENDING)], name="active_order_position_id"),
+        IndexModel([("order_position", ASCENDING)], name="order_position"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("verification_token", ASCENDING)], name="verification_token"),
+        IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="active_created_id"),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "password_resets": [
+        IndexModel([("reset_token", ASCENDING)], name="reset_token"),
+        IndexModel([("resource_id", ASCENDING), ("reset_token_expiry", ASCENDING)], name="resource_expiry"),
+    ],
+    "resource_pages": [
+        IndexModel([("slug", ASCENDING)], name="slug"),
+    ],
+    "playlists": [
+        IndexModel([("playlist_id", ASCENDING)], name="playlist_id", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", ASCENDING)], name="user_created"),
+    ],
+    "playlist_items": [
+        IndexModel([("playlist_id", ASCENDING), ("position", ASCENDING)], name="playlist_position"),
+        IndexModel([("playlist_id", ASCENDING), ("video_id", ASCENDING)], name="playlist_video", unique=True),
+    ],
+}
+
+# Representative service find queries checked by verify_query_plans: (name, collection, filter, sort)
+QUERY_SHAPES = [
+    ("stories_by_channel", "audio_stories", {"channel_id": ObjectId(), "is_ready": True}, {"created_at": -1, "_id": -1}),
+    ("story_by_file_path", "audio_stories", {"channel_id": ObjectId(), "file_path": "x"}, None),
+    ("active_channels", "channels", {"is_active": True}, {"order_position": 1, "_id": 1}),
+    ("channel_order_range", "channels", {"order_position": {"$gte": 1, "$lt": 5}}, None),
+    ("active_users", "users", {"is_active": True}, {"created_at": -1, "_id": -1}),
+    ("user_by_email", "users", {"email": "x@example.com", "is_active": True}, None),
+    ("user_by_verification_token", "users", {"verification_token": "x", "is_active": True}, None),
+    ("admin_by_email", "admins", {"email": "x@example.com", "is_active": True}, None),
+    ("reset_by_token", "password_resets", {"reset_token": "x", "is_active": True, "reset_token_expiry": {"$gt": datetime.utcnow()}}, None),
+    ("reset_by_resource", "password_resets", {"resource_id": ObjectId(), "is_active": True, "reset_token_expiry": {"$gt": datetime.utcnow()}}, None),
+    ("page_by_slug", "resource_pages", {"slug": "x", "is_active": True}, None),
+    ("playlists_by_user", "playlists", {"user_id": ObjectId()}, {"created_at": 1}),
+    ("playlist_by_id", "playlists", {"user_id": ObjectId(), "playlist_id": "x"}, None),
+    ("playlist_items_page", "playlist_items", {"playlist_id": "x"}, {"position": 1}),
+    ("playlist_item_by_video", "playlist_items", {"playlist_id": "x", "video_id": ObjectId()}, None),
+]
+
+# Aggregations run by the list endpoints, built by the services themselves: (name, collection, pipeline)
+def build_pipeline_shapes() -> list:
+    # Imported here, the services import db themselves
+    from app.services import AudioStoriesService, ChannelService, PlaylistService
+    from utils.helpers import encode_cursor
+
+    stories, channels, playlists = AudioStoriesService(), ChannelService(), PlaylistService()
+    return [
+        ("stories_page", "audio_stories", stories.build_story_page_pipeline(ObjectId(), 20, 10)),
+        ("stories_after_cursor", "audio_stories", stories.build_story_page_pipeline(ObjectId(), 0, 10, encode_cursor("2024-01-01T00:00:00", ObjectId()))),
+        ("active_channels_page", "channels", channels.build_channel_page_pipeline(20, 10)),
+        ("active_channels_after_cursor", "channels", channels.build_channel_page_pipeline(0, 10, encode_cursor(5, ObjectId()))),
+        ("playlist_contents_page", "playlist_items", playlists.build_contents_pipeline("x", 50, 50)),
+        ("playlist_contents_after_cursor", "playlist_items", playlists.build_contents_pipeline("x", 0, 50, 5)),
+    ]
+
+# Plan stages that mean a full scan or an in-memory sort
+REJECTED_STAGES = {"COLLSCAN", "SORT"}
+
+# Create every declared index; existing ones are left as they are
+async def ensure_indexes(database=db) -> dict:
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await database[collection].create_indexes(indexes)
+            logger.info("Ensured indexes on %s: %s", collection, ", ".join(created[collection]))
+        except PyMongoError as e:
+            logger.error("Could not ensure indexes on %s: %s", collection, e)
+    return created
+
+# Collect every stage name of an explain() plan
+def collect_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(collect_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(collect_stages(value))
+    return stages
+
+# Collect the winning plans of an explain() result, one per query the server plans
+def collect_winning_plans(explain) -> list:
+    plans = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                plans.append(value)
+            else:
+                plans.extend(collect_winning_plans(value))
+    elif isinstance(explain, list):
+        for value in explain:
+            plans.extend(collect_winning_plans(value))
+    return plans
+
+# Rejected stages of an explain() result; a $sort left in an aggregation is sorted in memory
+def rejected_stages(explain: dict) -> list:
+    stages = [stage for plan in collect_winning_plans(explain) for stage in collect_stages(plan)]
+    rejected = set(REJECTED_STAGES.intersection(stages))
+    if any("$sort" in stage for stage in explain.get("stages", [])):
+        rejected.add("$sort")
+    return sorted(rejected)
+
+# Explain each registered query shape and aggregation, reporting those using a COLLSCAN or in-memory SORT
+async def verify_query_plans(database=db) -> list:
+    explains = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        find = {"find": collection, "filter": query, "limit": 10}
+        if sort:
+            find["sort"] = sort
+        explains.append((name, collection, find))
+    for name, collection, pipeline in build_pipeline_shapes():
+        explains.append((name, collection, {"aggregate": collection, "pipeline": pipeline, "cursor": {}}))
+
+    failures = []
+    for name, collection, command in explains:
+        explain = await database.command({"explain": command, "verbosity": "queryPlanner"})
+        rejected = rejected_stages(explain)
+
+        if rejected:
+            logger.error("Query %s on %s uses %s", name, collection, ", ".join(rejected))
+            failures.append({"query": name, "collection": collection, "stages": rejected})
+        else:
+            logger.info("Query %s on %s is index-backed", name, collection)
+    return failures
+
+# CLI: python -m db.indexes ensure|verify
+async def main(command: str) -> int:
+    if command in ("ensure", "all"):
+        await ensure_indexes()
+    if command in ("verify", "all"):
+        failures = await verify_query_plans()
+        if failures:
+            for failure in failures:
+                print(f"FAIL {failure['query']} ({failure['collection']}): {', '.join(failure['stages'])}")
+            return 1
+        print(f"OK {len(QUERY_SHAPES) + len(build_pipeline_shapes())} queries are index-backed")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Ensure MongoDB indexes and verify query plans")
+    parser.add_argument("command", choices=["ensure", "verify", "all"])
+    sys.exit(asyncio.run(main(parser.parse_args().command)))
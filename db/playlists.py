@@ -0,0 +1,79 @@
+# playlists.py
+import argparse
+import asyncio
+import logging
+import sys
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from db.conn import db
+from utils.helpers import get_current_iso_timestamp
+
+logger = logging.getLogger("playlists")
+
+# Copy playlists embedded in user documents into the playlists and playlist_items collections.
+# Safe to rerun: playlists and items are upserted on their unique keys.
+async def migrate_playlists(database=db, unset: bool = False) -> dict:
+    migrated = {"users": 0, "playlists": 0, "items": 0}
+    now = get_current_iso_timestamp()
+
+    async for user in database.users.find({"playlists": {"$exists": True}}, {"playlists": 1, "created_at": 1}):
+        for playlist in user.get("playlists") or []:
+            playlist_id = playlist.get("playlist_id")
+            if not playlist_id:
+                logger.warning("Skipping playlist without playlist_id on user %s", user["_id"])
+                continue
+
+            # Embedded order becomes the item position, repeated videos keep their first slot
+            videos = list(dict.fromkeys(playlist.get("videos") or []))
+            await database.playlists.update_one(
+                {"playlist_id": playlist_id},
+                {
+                    "$setOnInsert": {
+                        "user_id": user["_id"],
+                        "name": playlist.get("name", "My Playlist"),
+                        "created_at": user.get("created_at") or now,
+                        "updated_at": now,
+                    },
+                    "$max": {"next_position": len(videos)},
+                },
+                upsert=True
+            )
+            if videos:
+                await database.playlist_items.bulk_write([
+                    UpdateOne(
+                        {"playlist_id": playlist_id, "video_id": video_id},
+                        {"$setOnInsert": {"position": position, "added_at": now}},
+                        upsert=True
+                    )
+                    for position, video_id in enumerate(videos, start=1)
+                ], ordered=False)
+
+            migrated["playlists"] += 1
+            migrated["items"] += len(videos)
+
+        # Embedded copies are only dropped once every playlist of the user has been written
+        if unset:
+            await database.users.update_one({"_id": user["_id"]}, {"$unset": {"playlists": ""}})
+        migrated["users"] += 1
+
+    logger.info("Migrated %(playlists)d playlists with %(items)d items from %(users)d users", migrated)
+    return migrated
+
+# CLI: python -m db.playlists migrate [--unset]
+async def main(command: str, unset: bool) -> int:
+    if command == "migrate":
+        try:
+            result = await migrate_playlists(unset=unset)
+        except PyMongoError as e:
+            logger.error("Could not migrate playlists: %s", e)
+            return 1
+        print(f"OK {result['playlists']} playlists, {result['items']} items from {result['users']} users")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Move embedded user playlists into the playlist collections")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--unset", action="store_true", help="Remove the embedded playlists from user documents afterwards")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.command, args.unset)))
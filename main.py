@@ -5,15 +5,31 @@ from logging_setup import logger
 import traceback
 from app.middleware.logging_middleware import LoggingMiddleware
 from app.middleware.cors import CORSConfig
+from app.middleware.request_scope import RequestScopeMiddleware
 from app.routers import authRouter, adminRouter, userRouter, pageRouter
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from contextlib import asynccontextmanager
+from config import config
+from db.indexes import ensure_indexes
+from app.services.channel_catalog import channel_catalog
+
+# Ensure MongoDB indexes and load the channel catalog before serving requests
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config["mongo_ensure_indexes"]:
+        await ensure_indexes()
+    if config["channel_catalog_enabled"]:
+        await channel_catalog.start()
+    yield
+    await channel_catalog.stop()
 
 # Initialize FastAPI app with docs disabled
 app = FastAPI(
     docs_url=None,
     redoc_url=None,
-    openapi_url=None
+    openapi_url=None,
+    lifespan=lifespan
 )
 
 # Setup CORS
@@ -21,6 +37,7 @@ CORSConfig.setup_cors(app)
 
 # Add middleware and routers
 app.add_middleware(LoggingMiddleware, logger=logger)
+app.add_middleware(RequestScopeMiddleware)
 app.include_router(authRouter)
 app.include_router(adminRouter)
 app.include_router(userRouter)
@@ -45,7 +62,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     logger.warning(f"[HTTP ERROR] {request.method} {request.url} | {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(RequestValidationError)
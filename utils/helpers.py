@@ -1,10 +1,16 @@
 #  helpers.py
 from datetime import datetime, timezone, timedelta
 import time, uuid, re
-from jose import jwt, JWTError, ExpiredSignatureError
 from config import config
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
 from urllib.parse import quote_plus
+from functools import lru_cache
+from bson import ObjectId, json_util
+import base64
+import gzip
+import hashlib
+import hmac
 
 # Get current ISO timestamp in UTC
 def get_current_iso_timestamp() -> datetime:
@@ -25,37 +31,72 @@ def sanitize_filename(filename: str) -> str:
     # remove ../ and special chars for safety
     return re.sub(r"[^a-zA-Z0-9_\-.]", "", filename)
 
-# Generate a signed URL for downloading audio files
-def generate_signed_url(filename: str, expiry_seconds: int = 86400) -> str:
-    safe_filename = sanitize_filename(filename)
+# Signing keys for download URLs by key id; without configured keys one is derived from SECRET_KEY
+@lru_cache(maxsize=None)
+def get_signed_url_keys() -> dict:
+    keys = {}
+    for entry in filter(None, (part.strip() for part in config.get("signed_url_keys", "").split(","))):
+        key_id, _, secret = entry.partition(":")
+        if key_id and secret:
+            keys[key_id] = secret.encode("utf-8")
 
-    payload = {
-        "filename": safe_filename,
-        "exp": int(time.time()) + expiry_seconds
-    }
+    if not keys:
+        keys["0"] = hmac.new(config["secret_key"].encode("utf-8"), b"signed-url", hashlib.sha256).digest()
+    return keys
 
-    token = jwt.encode(payload, config.get("secret_key"), algorithm=config.get("algorithm", "HS256"))
-    base_url = config.get("base_url", "http://localhost:8000/")
+# Key id used to sign new download URLs
+def get_active_signed_url_key_id() -> str:
+    keys = get_signed_url_keys()
+    key_id = config.get("signed_url_active_key")
+    return key_id if key_id in keys else next(iter(keys))
+
+# HMAC-SHA256 signature of a download URL, base64url-encoded without padding
+def sign_download(key_id: str, filename: str, expires: int, user_id: str = "") -> str:
+    message = f"{key_id}\n{filename}\n{expires}\n{user_id}".encode("utf-8")
+    digest = hmac.new(get_signed_url_keys()[key_id], message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
 
+# Generate signed URLs for many files sharing one expiry and key
+def generate_signed_urls(filenames: list, expiry_seconds: int = 86400, user_id: str = None) -> dict:
+    key_id = get_active_signed_url_key_id()
+    expires = int(time.time()) + expiry_seconds
+    user_id = user_id or ""
+
+    base_url = config.get("base_url", "http://localhost:8000/")
     if not base_url.endswith("/"):
         base_url += "/"
 
-    return f"{base_url}users/audio-download/{safe_filename}?token={token}"
+    urls = {}
+    for filename in filenames:
+        safe_filename = sanitize_filename(filename)
+        token = f"{key_id}.{expires}.{user_id}.{sign_download(key_id, safe_filename, expires, user_id)}"
+        urls[filename] = f"{base_url}users/audio-download/{safe_filename}?token={token}"
+    return urls
 
-# Decode a signed URL token to retrieve the filename and expiration
-def decode_signed_url_token(token: str) -> dict:
-    try:
-        payload = jwt.decode(
-            token,
-            config.get("secret_key"),
-            algorithms=[config.get("algorithm", "HS256")]
-        )
-        return payload
-    except ExpiredSignatureError:
-        raise HTTPException(status_code=403, detail="URL expired")
-    except JWTError:
+# Generate a signed URL for downloading audio files
+def generate_signed_url(filename: str, expiry_seconds: int = 86400, user_id: str = None) -> str:
+    return generate_signed_urls([filename], expiry_seconds, user_id)[filename]
+
+# Verify a download token ("key_id.expires.user_id.signature") for a filename and return its user id
+def verify_signed_url_token(filename: str, token: str) -> str:
+    parts = token.split(".")
+    if len(parts) != 4:
         raise HTTPException(status_code=403, detail="Invalid token")
 
+    # Every field is ASCII as issued; isdigit() alone would accept digits int() cannot parse, like "²"
+    key_id, expires, user_id, signature = parts
+    if not token.isascii() or not expires.isdecimal() or key_id not in get_signed_url_keys():
+        raise HTTPException(status_code=403, detail="Invalid token")
+
+    expires = int(expires)
+    expected = sign_download(key_id, filename, expires, user_id)
+    if not hmac.compare_digest(expected, signature):
+        raise HTTPException(status_code=403, detail="Invalid token")
+
+    if expires < time.time():
+        raise HTTPException(status_code=403, detail="URL expired")
+    return user_id or None
+
 # Generate a secure verification token
 def generate_verification_token() -> str:
     import secrets
@@ -76,4 +117,50 @@ def generate_placeholder_img(text, width=75, height=75, bg_color="e5d5f7", text_
     encoded_text = quote_plus(text)
 
     url = f"https://placehold.co/{width}x{height}/{bg_color}/{text_color}?text={encoded_text}&font=poppins"
-    return url
\ No newline at end of file
+    return url
+
+# Build a raw JSON response from a cached (body, gzipped) pair, skipping response model validation
+def build_cached_response(request: Request, cached: tuple) -> Response:
+    body, gzipped = cached
+    headers = {"Vary": "Accept-Encoding"}
+
+    if gzipped:
+        if "gzip" in request.headers.get("accept-encoding", "").lower():
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Encode the sort key and _id of the last item of a page as an opaque pagination cursor
+def encode_cursor(sort_value, last_id) -> str:
+    payload = json_util.dumps([sort_value, last_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+# Decode a pagination cursor into its (sort_value, last_id) pair
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, last_id = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(last_id, ObjectId):
+            raise ValueError("cursor id is not an ObjectId")
+        return sort_value, last_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Build the filter selecting items after a cursor in (field, _id) order
+def build_keyset_filter(field: str, cursor: str, descending: bool = False) -> dict:
+    sort_value, last_id = decode_cursor(cursor)
+    operator = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {operator: sort_value}},
+        {field: sort_value, "_id": {operator: last_id}}
+    ]}
+
+# Aggregation for one list page: match (keyset filter included) and sort are served by an index,
+# so only the page itself is read and projected. Totals are counted separately.
+def build_page_pipeline(query: dict, sort: dict, skip: int, limit: int, projection: dict, page_filter: dict = None) -> list:
+    return [
+        {"$match": {**query, **page_filter} if page_filter else query},
+        {"$sort": sort}
+    ] + ([{"$skip": skip}] if skip else []) + [{"$limit": limit}, {"$project": projection}]